@@ -0,0 +1,158 @@
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+
+
+class LocalLRUCache:
+    """
+    Thread-safe in-process cache bounded by LRU eviction, with an optional per-entry TTL.
+    Use Case: Keeping small, hot lookups (answer keys, auth tokens, ...) in the worker's memory.
+    """
+
+    def __init__(self, max_entries=256, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires_at = self._data[key]
+            except KeyError:
+                return default
+
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class VersionedCache:
+    """
+    Cache of values rebuilt from the database: an in-process LRU, optionally backed by one of Django's caches.
+    Use Case: Serving per-quiz data that changes rarely but is read by every request (answer keys, delivery
+    payloads) from memory, while edits still reach every worker.
+
+    When a Django cache is configured, every key has a version number stored in it. Values are stored under
+    their version and invalidation bumps it, so all workers drop stale values at once. Without one,
+    invalidation only reaches the current worker, and the others keep a stale value for at most
+    `local_timeout` seconds.
+
+    Subclasses set `prefix` and implement `load(key)`, which returns None for values that should not be cached.
+    """
+
+    prefix = None
+
+    def __init__(self, max_entries=256, local_timeout=5, cache_alias=None, timeout=None):
+        self.shared = caches[cache_alias] if cache_alias else None
+        # With a shared cache the version is checked on every read, local entries need no expiry.
+        self.local = LocalLRUCache(max_entries=max_entries, ttl=local_timeout if self.shared is None else None)
+        self.timeout = timeout
+
+    def version_key(self, key):
+        return f'{self.prefix}-version:{key}'
+
+    def entry_key(self, key, version):
+        return f'{self.prefix}:{key}:{version}'
+
+    def load(self, key):
+        raise NotImplementedError
+
+    def version(self, key):
+        if self.shared is None:
+            return 0
+        version = self.shared.get(self.version_key(key))
+        if version is None:
+            # A missing version, never bumped or evicted, starts from the clock so it cannot come back to a
+            # version whose entries may still be cached. Another worker may have added it first.
+            self.shared.add(self.version_key(key), time.time_ns(), None)
+            version = self.shared.get(self.version_key(key), 0)
+        return version
+
+    async def aversion(self, key):
+        if self.shared is None:
+            return 0
+        version = await self.shared.aget(self.version_key(key))
+        if version is None:
+            await self.shared.aadd(self.version_key(key), time.time_ns(), None)
+            version = await self.shared.aget(self.version_key(key), 0)
+        return version
+
+    def get(self, key):
+        version = self.version(key)
+
+        cached = self.local.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        value = None
+        if self.shared is not None:
+            value = self.shared.get(self.entry_key(key, version))
+
+        if value is None:
+            value = self.load(key)
+            if value is None:
+                return None
+            if self.shared is not None:
+                self.shared.set(self.entry_key(key, version), value, self.timeout)
+
+        self.local.set(key, (version, value))
+        return value
+
+    async def aget(self, key):
+        version = await self.aversion(key)
+
+        cached = self.local.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        value = None
+        if self.shared is not None:
+            value = await self.shared.aget(self.entry_key(key, version))
+
+        if value is None:
+            # Rare (once per change), the loader is shared with the sync path.
+            value = await sync_to_async(self.load)(key)
+            if value is None:
+                return None
+            if self.shared is not None:
+                await self.shared.aset(self.entry_key(key, version), value, self.timeout)
+
+        self.local.set(key, (version, value))
+        return value
+
+    def invalidate(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            try:
+                self.shared.incr(self.version_key(key))
+            except ValueError:
+                self.shared.set(self.version_key(key), time.time_ns(), None)
+
+    def clear(self):
+        self.local.clear()
@@ -0,0 +1,155 @@
+import contextvars
+import heapq
+import json
+import logging
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger('QuizAPI.requests')
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper counting the queries of a request, their total time and the slowest of them.
+    """
+
+    def __init__(self, worst_queries):
+        self.count = 0
+        self.duration = 0.0
+        self.worst_queries = worst_queries
+        self.slowest = []
+        # Async views run their queries in several threads.
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started_at
+            with self._lock:
+                self.count += 1
+                self.duration += duration
+                if self.worst_queries:
+                    entry = (duration, self.count, sql)
+                    if len(self.slowest) < self.worst_queries:
+                        heapq.heappush(self.slowest, entry)
+                    else:
+                        heapq.heappushpop(self.slowest, entry)
+
+
+# Recorder of the current request. Context variables follow the request into the threads of sync_to_async.
+_current_recorder = contextvars.ContextVar('request_metrics_recorder', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def install_query_recorders():
+    # Only for connections of this thread opened before this module was loaded.
+    for connection in connections.all(initialized_only=True):
+        install_query_recorder(connection)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    # Connections are per thread, so the recorder is installed in every thread that queries.
+    install_query_recorder(connection)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records, for each request, the SQL query count, the DB time and the total time, and reports them in a
+    `Server-Timing` header and a structured log line. Requests slower than the threshold are logged with
+    their worst queries.
+    Use Case: Finding which endpoints are DB-bound in production. Enabled with REQUEST_METRICS['ENABLED'].
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        options = getattr(settings, 'REQUEST_METRICS', {})
+        if not options.get('ENABLED'):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.slow_request_ms = options.get('SLOW_REQUEST_MS', 500)
+        self.worst_queries = options.get('WORST_QUERIES', 5)
+        self.sync_thread_ready = False
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        recorder, token, started_at = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, started_at)
+
+    async def __acall__(self, request):
+        if not self.sync_thread_ready:
+            # The ORM runs in the sync_to_async thread, whose connections may predate this middleware.
+            await sync_to_async(install_query_recorders)()
+            self.sync_thread_ready = True
+
+        recorder, token, started_at = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, started_at)
+
+    def start(self):
+        install_query_recorders()
+        recorder = QueryRecorder(self.worst_queries)
+        return recorder, _current_recorder.set(recorder), time.perf_counter()
+
+    def finish(self, request, response, recorder, started_at):
+        total_ms = (time.perf_counter() - started_at) * 1000
+        db_ms = recorder.duration * 1000
+
+        response['Server-Timing'] = (
+            f'db;dur={db_ms:.2f};desc="{recorder.count} queries", app;dur={total_ms - db_ms:.2f}, '
+            f'total;dur={total_ms:.2f}'
+        )
+
+        metrics = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'db_ms': round(db_ms, 2),
+            'app_ms': round(total_ms - db_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }
+        if total_ms >= self.slow_request_ms:
+            metrics['worst_queries'] = [
+                {'ms': round(duration * 1000, 2), 'sql': sql}
+                for duration, _, sql in sorted(recorder.slowest, reverse=True)
+            ]
+            logger.warning(json.dumps(metrics))
+        else:
+            logger.info(json.dumps(metrics))
+
+        return response
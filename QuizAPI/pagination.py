@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key.
+    Use Case: Paginating large tables where deep pages must cost the same as the first one (no OFFSET scans).
+    """
+
+    ordering = 'id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class StartedAtCursorPagination(IdCursorPagination):
+    """
+    Keyset pagination on the start time, newest first, with the id breaking ties.
+    Use Case: Paginating histories straight from an index ending with the start time and the id.
+    """
+
+    # The cursor needs a unique ordering, or rows sharing a start time with a page boundary are skipped.
+    ordering = ('-started_at', '-id')
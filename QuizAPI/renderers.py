@@ -0,0 +1,76 @@
+import math
+import re
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# The end of a float value or key in compact JSON output, also found in some strings. orjson and the stdlib format
+# some floats differently (`1e-7` and `1e-07`).
+FLOAT_TOKEN = re.compile(rb'[0-9][.eE][-+]?[0-9]+(?:[,\]}]|":|\Z)')
+
+
+def contains_non_finite(data):
+    """
+    Whether a payload holds a NaN or infinite float or Decimal, which orjson writes as null and DRF refuses.
+    """
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (float, Decimal)):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value)
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer encoding with orjson when it is installed, with the same output bytes as the stdlib encoder.
+    Use Case: Cutting the encoding time of large nested payloads such as quizzes with hundreds of questions.
+
+    Indented output, non-compact or ASCII-only settings, values orjson cannot encode (integers above 64 bits, ...)
+    and payloads with floats go through the stdlib encoder of DRF. orjson formats some floats differently
+    (`1e-7` for `1e-07`) and writes NaN and infinities as null where DRF refuses them.
+    """
+
+    # Datetimes and dataclasses go through the DRF encoder, orjson formats them differently.
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+               if orjson is not None else 0)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encode = self.encoder_class().default
+
+        def default(obj):
+            value = encode(obj)
+            if contains_non_finite(value):
+                raise TypeError('Out of range float values are not JSON compliant.')
+            return value
+
+        try:
+            ret = orjson.dumps(data, default=default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Payloads with floats are left to the stdlib, which also refuses NaN and infinities.
+        if FLOAT_TOKEN.search(ret) or (b'null' in ret and contains_non_finite(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Escaped like the stdlib renderer, so the output stays a strict javascript subset.
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
@@ -0,0 +1,183 @@
+import functools
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+
+class ResponseCache:
+    """
+    Cache of rendered GET responses, keyed by URL, role and media type, in one of Django's caches.
+    Use Case: Serving read-mostly endpoints without touching the ORM or the serializers.
+
+    Every cached response belongs to one or more namespaces, each with a generation number stored in the
+    cache. Writes bump the generation of the namespaces they affect, which orphans the old entries at once
+    in every worker; the orphans then age out of the bounded cache.
+    """
+
+    def __init__(self, enabled=True, cache_alias='default', timeout=300, max_bytes=1024 * 1024):
+        self.enabled = enabled
+        self.cache = caches[cache_alias]
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.counters = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'RESPONSE_CACHE', {})
+        return cls(
+            enabled=options.get('ENABLED', True),
+            cache_alias=options.get('CACHE_ALIAS', 'default'),
+            timeout=options.get('TIMEOUT', 300),
+            max_bytes=options.get('MAX_BYTES', 1024 * 1024),
+        )
+
+    @staticmethod
+    def generation_key(namespace):
+        return f'response-generation:{namespace}'
+
+    @staticmethod
+    def role(request):
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return 'anonymous'
+        return 'staff' if user.is_staff else 'user'
+
+    def generations(self, namespaces):
+        """
+        Return the current generation of every namespace. A generation that is missing, never bumped, expired or
+        evicted, starts from the clock, so it cannot come back to a value seen before. Generations expire like the
+        entries, which bounds how long a worker misses the writes of the others without a shared cache.
+        """
+        keys = [self.generation_key(namespace) for namespace in namespaces]
+        generations = self.cache.get_many(keys)
+        for key in keys:
+            if key not in generations:
+                # Another worker may have added it first.
+                self.cache.add(key, time.time_ns(), self.timeout)
+                generations[key] = self.cache.get(key, 0)
+        return [generations[key] for key in keys]
+
+    def entry_key(self, request, namespaces):
+        state = '|'.join(
+            f'{namespace}={generation}'
+            for namespace, generation in zip(namespaces, self.generations(namespaces)))
+        media_type = getattr(request, 'accepted_media_type', '')
+        digest = hashlib.md5(f'{state}|{media_type}|{request.get_full_path()}'.encode()).hexdigest()
+        return f'response:{self.role(request)}:{digest}'
+
+    def count(self, namespace, event):
+        with self._lock:
+            self.counters[(namespace, event)] += 1
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+
+        namespaces = {}
+        for (namespace, event), value in counters.items():
+            namespaces.setdefault(namespace, {'hits': 0, 'misses': 0})[event] = value
+        return {
+            'hits': sum(namespace['hits'] for namespace in namespaces.values()),
+            'misses': sum(namespace['misses'] for namespace in namespaces.values()),
+            'namespaces': namespaces,
+        }
+
+    def invalidate(self, *namespaces):
+        for namespace in namespaces:
+            try:
+                self.cache.incr(self.generation_key(namespace))
+            except ValueError:
+                self.cache.set(self.generation_key(namespace), time.time_ns(), self.timeout)
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache.from_settings()
+    return _response_cache
+
+
+def invalidate_responses(*namespaces):
+    """
+    Drop the cached responses of the namespaces, now and once the current transaction commits, so a read
+    running before the commit cannot keep the old content cached.
+    """
+    response_cache = get_response_cache()
+    response_cache.invalidate(*namespaces)
+    transaction.on_commit(lambda: response_cache.invalidate(*namespaces))
+
+
+@receiver(setting_changed)
+def reset_response_cache(setting, **kwargs):
+    global _response_cache
+    if setting == 'RESPONSE_CACHE':
+        _response_cache = None
+
+
+def cache_response(namespaces_func):
+    """
+    Decorator of the `get` method of an API view, caching its rendered 200 responses.
+    `namespaces_func(request, *args, **kwargs)` returns the namespaces the response depends on. It runs after
+    authentication and permissions, so a hit only skips the view itself. Responses carry an X-Cache header.
+    """
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(request, *args, **kwargs):
+            response_cache = get_response_cache()
+            if not response_cache.enabled or request.method != 'GET':
+                return view_method(request, *args, **kwargs)
+
+            namespaces = namespaces_func(request, *args, **kwargs)
+            stats_namespace = namespaces[0].split(':')[0]
+            key = response_cache.entry_key(request, namespaces)
+            entry = response_cache.cache.get(key)
+
+            if entry is not None:
+                response_cache.count(stats_namespace, 'hits')
+                content, content_type, etag, last_modified = entry
+                response = HttpResponse(content, content_type=content_type)
+                if etag:
+                    response['ETag'] = etag
+                if last_modified:
+                    response['Last-Modified'] = last_modified
+                # The same checks as the view's own conditional GET: weak comparison of If-None-Match and
+                # If-Modified-Since, which both answer with a 304.
+                response = get_conditional_response(
+                    request, etag=etag, last_modified=last_modified and parse_http_date_safe(last_modified),
+                    response=response)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response_cache.count(stats_namespace, 'misses')
+            response = view_method(request, *args, **kwargs)
+            response['X-Cache'] = 'MISS'
+
+            def store(rendered):
+                if rendered.status_code == 200 and len(rendered.content) <= response_cache.max_bytes:
+                    response_cache.cache.set(key, (
+                        rendered.content, rendered['Content-Type'], rendered.get('ETag'),
+                        rendered.get('Last-Modified'),
+                    ), response_cache.timeout)
+
+            if hasattr(response, 'add_post_render_callback'):
+                response.add_post_render_callback(store)
+            return response
+
+        return wrapper
+
+    return decorator
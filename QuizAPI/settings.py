@@ -33,6 +33,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'account.UserProfile'
 
 MIDDLEWARE = [
+    'QuizAPI.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -96,10 +97,99 @@ AUTH_PASSWORD_VALIDATORS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'account.authentication.CachedTokenAuthentication',
     ],
+    # orjson based when it is installed, the stdlib json module otherwise.
+    'DEFAULT_RENDERER_CLASSES': [
+        'QuizAPI.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'QuizAPI.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Caches
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rendered API responses (QuizAPI.response_cache), bounded so large payloads cannot grow the worker unchecked.
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'responses',
+        'OPTIONS': {'MAX_ENTRIES': int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 1000))},
+    },
+}
+
+# Settings for the cache of the read-mostly GET endpoints (QuizAPI.response_cache.cache_response)
+
+RESPONSE_CACHE = {
+    'ENABLED': os.environ.get('RESPONSE_CACHE', 'True') == 'True',
+    'CACHE_ALIAS': 'responses',
+    # Safety net only, entries are invalidated by the model signals.
+    'TIMEOUT': 300,
+    # Responses larger than this are not cached.
+    'MAX_BYTES': 1024 * 1024,
+}
+
+# Settings for the token -> user cache of account.authentication.CachedTokenAuthentication
+
+AUTH_TOKEN_CACHE = {
+    'MAX_ENTRIES': 10000,
+    # Seconds a worker keeps a token in memory, this bounds how long a logged out token may still be served
+    # by the other workers.
+    'LOCAL_TIMEOUT': int(os.environ.get('AUTH_TOKEN_CACHE_LOCAL_TIMEOUT', 10)),
+    # Alias of a shared Django cache backing the in-process cache, None keeps it process local.
+    'CACHE_ALIAS': os.environ.get('AUTH_TOKEN_CACHE_ALIAS') or None,
+    'TIMEOUT': 60,
+}
+
+# Settings for the per-request SQL and timing instrumentation (QuizAPI.middleware.RequestMetricsMiddleware)
+
+REQUEST_METRICS = {
+    'ENABLED': os.environ.get('REQUEST_METRICS') == 'True',
+    # Requests slower than this are logged as warnings, with their worst queries.
+    'SLOW_REQUEST_MS': int(os.environ.get('REQUEST_METRICS_SLOW_MS', 500)),
+    'WORST_QUERIES': 5,
 }
 
+# Settings for the answer key cache used to score submissions
+
+QUIZ_ANSWER_KEY_CACHE = {
+    'MAX_ENTRIES': int(os.environ.get('QUIZ_ANSWER_KEY_CACHE_MAX_ENTRIES', 512)),
+    # Seconds a worker keeps an answer key without a shared cache. This bounds how long the other workers may
+    # score submissions against a key that was just edited.
+    'LOCAL_TIMEOUT': int(os.environ.get('QUIZ_ANSWER_KEY_CACHE_LOCAL_TIMEOUT', 5)),
+    # Alias of a shared Django cache backing the in-process cache, None keeps it process local. Set it when
+    # running several workers, edits then reach all of them at once.
+    'CACHE_ALIAS': os.environ.get('QUIZ_ANSWER_KEY_CACHE_ALIAS') or None,
+    'TIMEOUT': None,
+}
+
+# Settings for the cache of the pre-rendered quiz delivery payloads (quiz.delivery.DeliveryCache)
+
+QUIZ_DELIVERY_CACHE = {
+    'MAX_ENTRIES': int(os.environ.get('QUIZ_DELIVERY_CACHE_MAX_ENTRIES', 128)),
+    # Seconds a worker keeps a payload without a shared cache. This bounds how long the other workers may
+    # serve a quiz that was just edited.
+    'LOCAL_TIMEOUT': int(os.environ.get('QUIZ_DELIVERY_CACHE_LOCAL_TIMEOUT', 5)),
+    # Alias of a shared Django cache backing the in-process cache, None keeps it process local. Set it when
+    # running several workers, edits then reach all of them at once.
+    'CACHE_ALIAS': os.environ.get('QUIZ_DELIVERY_CACHE_ALIAS') or None,
+    'TIMEOUT': None,
+    # Also keep a gzip variant of the payloads of at least GZIP_MIN_BYTES bytes.
+    'GZIP': True,
+    'GZIP_MIN_BYTES': 1024,
+}
+
+# Seconds during which a new login does not rewrite UserProfile.last_login
+
+LAST_LOGIN_UPDATE_INTERVAL = int(os.environ.get('LAST_LOGIN_UPDATE_INTERVAL', 60))
+
 # Settings for REST_FRAMEWORK
 
 SWAGGER_SETTINGS = {
@@ -140,3 +230,15 @@ EMAIL_PORT = 587
 EMAIL_USE_TLS = True
 EMAIL_USE_SSL = False
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
+
+# Settings of the email outbox drained by the send_queued_emails command (account.outbox)
+
+EMAIL_OUTBOX = {
+    # Number of emails sent over one backend connection.
+    'BATCH_SIZE': int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 50)),
+    'MAX_ATTEMPTS': 5,
+    # Seconds before the first retry of a failed email, doubled after every further failure.
+    'RETRY_BACKOFF': 60,
+    # Seconds a claimed batch is hidden from other workers while it is being sent.
+    'CLAIM_TIMEOUT': 300,
+}
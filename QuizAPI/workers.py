@@ -0,0 +1,10 @@
+import django
+
+
+def setup_worker():
+    """
+    Initializer of the worker processes of the data generation commands.
+    Workers started with the "spawn" method (macOS, Windows) do not inherit the configured Django settings. This
+    module imports no model, so that the workers can load it before Django is set up.
+    """
+    django.setup()
@@ -1,4 +1,10 @@
 from django.contrib import admin
-from account.models import UserProfile
+from account.models import UserProfile, OutgoingEmail
 
 admin.site.register(UserProfile)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
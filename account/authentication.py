@@ -0,0 +1,156 @@
+import copy
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+
+from QuizAPI.cache import LocalLRUCache
+
+
+class TokenUserCache:
+    """
+    Cache of token key -> user: a short-lived in-process LRU, optionally backed by one of Django's caches.
+    Use Case: Authenticating requests without a Token/UserProfile query each time.
+
+    Invalidation reaches the shared cache and the local cache of the current worker. Other workers may keep
+    a stale local entry for at most LOCAL_TIMEOUT seconds.
+    """
+
+    def __init__(self, max_entries=10000, local_timeout=10, cache_alias=None, timeout=60):
+        self.local = LocalLRUCache(max_entries=max_entries, ttl=local_timeout)
+        self.shared = caches[cache_alias] if cache_alias else None
+        self.timeout = timeout
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'AUTH_TOKEN_CACHE', {})
+        return cls(
+            max_entries=options.get('MAX_ENTRIES', 10000),
+            local_timeout=options.get('LOCAL_TIMEOUT', 10),
+            cache_alias=options.get('CACHE_ALIAS'),
+            timeout=options.get('TIMEOUT', 60),
+        )
+
+    @staticmethod
+    def cache_key(key):
+        return f'account:auth-token:{key}'
+
+    def get(self, key):
+        user = self.local.get(key)
+        if user is None and self.shared is not None:
+            user = self.shared.get(self.cache_key(key))
+            if user is not None:
+                self.local.set(key, user)
+        return user
+
+    def set(self, key, user):
+        self.local.set(key, user)
+        if self.shared is not None:
+            self.shared.set(self.cache_key(key), user, self.timeout)
+
+    async def aget(self, key):
+        user = self.local.get(key)
+        if user is None and self.shared is not None:
+            user = await self.shared.aget(self.cache_key(key))
+            if user is not None:
+                self.local.set(key, user)
+        return user
+
+    async def aset(self, key, user):
+        self.local.set(key, user)
+        if self.shared is not None:
+            await self.shared.aset(self.cache_key(key), user, self.timeout)
+
+    def invalidate(self, key):
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(self.cache_key(key))
+
+
+_token_users = None
+
+
+def get_token_user_cache():
+    global _token_users
+    if _token_users is None:
+        _token_users = TokenUserCache.from_settings()
+    return _token_users
+
+
+def invalidate_token(key):
+    get_token_user_cache().invalidate(key)
+
+
+@receiver(setting_changed)
+def reset_token_user_cache(setting, **kwargs):
+    global _token_users
+    if setting == 'AUTH_TOKEN_CACHE':
+        _token_users = None
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement of TokenAuthentication caching the token -> user lookup.
+    The `aauthenticate` coroutine does the same for async views, with the async ORM and cache APIs.
+    """
+
+    def authenticate_credentials(self, key):
+        cache = get_token_user_cache()
+        user = cache.get(key)
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            cache.set(key, user)
+            return user, token
+
+        # Every request gets its own copy, so that nothing set on it leaks into the cache.
+        user = copy.copy(user)
+        return user, Token(key=key, user=user)
+
+    def get_token_key(self, request):
+        """
+        The key of the `Authorization: Token <key>` header, or None without such a header.
+        """
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        elif len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.'))
+
+    async def aauthenticate(self, request):
+        key = self.get_token_key(request)
+        if key is None:
+            return None
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        cache = get_token_user_cache()
+        user = await cache.aget(key)
+        if user is None:
+            try:
+                token = await Token.objects.select_related('user').aget(key=key)
+            except Token.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+            await cache.aset(key, token.user)
+            return token.user, token
+
+        user = copy.copy(user)
+        return user, Token(key=key, user=user)
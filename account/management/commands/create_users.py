@@ -1,6 +1,13 @@
+from concurrent.futures import ProcessPoolExecutor
+
 from account.models import UserProfile
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from faker import Faker
+from rest_framework.authtoken.models import Token
+
+from QuizAPI.workers import setup_worker
 
 
 class Command(BaseCommand):
@@ -9,10 +16,37 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('num_users', type=int, help='Number of users to create')
         parser.add_argument('output_file', type=str, help='Output file path')
+        parser.add_argument('--bulk', action='store_true',
+                            help='Create the users and their tokens with batched INSERTs')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Number of users inserted per transaction in bulk mode')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of processes hashing the passwords in bulk mode')
+        parser.add_argument('--password', type=str, default=None,
+                            help='Give every user this password in bulk mode, so it is hashed only once')
 
     def handle(self, *args, **options):
         num_users = options['num_users']
         output_file = options['output_file']
+
+        if options['bulk']:
+            user_data = self.create_users_in_bulk(num_users, options['batch_size'], options['workers'],
+                                                  options['password'])
+        else:
+            user_data = self.create_users(num_users)
+
+        # Save usernames and passwords to file
+        try:
+            with open(output_file, 'w') as file:
+                for data in user_data:
+                    file.write(f"Username: {data['username']}, Password: {data['password']}\n")
+        except IOError as e:
+            self.stderr.write(f"Error: {str(e)}")
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"Usernames and passwords saved to {output_file}"))
+
+    def create_users(self, num_users):
         faker = Faker()
 
         created_users = 0
@@ -44,13 +78,62 @@ class Command(BaseCommand):
                 self.stdout.write(f"User {user.username} created successfully. Password: {password}")
                 created_users += 1
 
-        # Save usernames and passwords to file
-        try:
-            with open(output_file, 'w') as file:
-                for data in user_data:
-                    file.write(f"Username: {data['username']}, Password: {data['password']}\n")
-        except IOError as e:
-            self.stderr.write(f"Error: {str(e)}")
-            return
+        return user_data
 
-        self.stdout.write(self.style.SUCCESS(f"Usernames and passwords saved to {output_file}"))
+    def create_users_in_bulk(self, num_users, batch_size, workers, password=None):
+        faker = Faker()
+
+        # Usernames and emails are deduplicated in memory instead of two queries per candidate.
+        usernames = set(UserProfile.objects.values_list('username', flat=True))
+        emails = set(UserProfile.objects.values_list('email', flat=True))
+
+        users = []
+        user_data = []
+        while len(users) < num_users:
+            username = faker.user_name()
+            email = faker.email()
+            if username in usernames or email in emails:
+                # Suffix the candidate rather than drawing again, the name pools run out past ~100k users.
+                suffix = len(usernames)
+                username, email = f'{username}{suffix}', f'{suffix}.{email}'
+                if username in usernames or email in emails:
+                    continue
+
+            usernames.add(username)
+            emails.add(email)
+            users.append(UserProfile(
+                username=username,
+                email=email,
+                gender=faker.random_element(['male', 'female', 'other']),
+                biography=faker.text(),
+                contact_number=faker.phone_number(),
+                address=faker.address(),
+                first_name=faker.first_name(),
+                last_name=faker.last_name()
+            ))
+            user_data.append({
+                'username': username,
+                'password': password or faker.password(),
+            })
+
+        passwords = [data['password'] for data in user_data]
+        if password is not None:
+            hashed_passwords = [make_password(password)] * num_users
+        elif workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=setup_worker) as executor:
+                hashed_passwords = list(executor.map(make_password, passwords, chunksize=64))
+        else:
+            hashed_passwords = [make_password(raw_password) for raw_password in passwords]
+
+        for user, hashed_password in zip(users, hashed_passwords):
+            user.password = hashed_password
+
+        # bulk_create does not send post_save, so the tokens are inserted here as well.
+        for start in range(0, num_users, batch_size):
+            batch = users[start:start + batch_size]
+            with transaction.atomic():
+                UserProfile.objects.bulk_create(batch)
+                Token.objects.bulk_create([Token(key=Token.generate_key(), user=user) for user in batch])
+            self.stdout.write(f"{start + len(batch)}/{num_users} users created")
+
+        return user_data
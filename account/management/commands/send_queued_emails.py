@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from account.outbox import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = 'Send the emails waiting in the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Number of emails sent over one backend connection')
+        parser.add_argument('--max-attempts', type=int, default=None,
+                            help='Number of attempts after which an email is marked as failed')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the outbox instead of exiting once it is drained')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Seconds to wait between polls of an empty outbox in loop mode')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_emails(options['batch_size'], options['max_attempts'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"{sent} emails sent, {failed} failed")
+            elif options['loop']:
+                time.sleep(options['interval'])
+            else:
+                break
+
+        self.stdout.write(self.style.SUCCESS(f"Outbox drained: {total_sent} emails sent, {total_failed} failed"))
@@ -0,0 +1,110 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from account.models import OutgoingEmail
+
+
+def enqueue_email(subject, body, to, from_email=None, content_subtype='plain'):
+    """
+    Store an email in the outbox. It is sent later by the send_queued_emails command.
+    """
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=list(to),
+        from_email=from_email,
+        content_subtype=content_subtype,
+    )
+
+
+def retry_delay(attempts, backoff):
+    """
+    Exponential backoff: `backoff` seconds after the first failure, doubled after every other one.
+    """
+    return timedelta(seconds=backoff * 2 ** (attempts - 1))
+
+
+def claim_due_emails(batch_size, claim_timeout):
+    """
+    Lock a batch of due emails, push their next attempt `claim_timeout` seconds away so that no other worker picks
+    them up while they are being sent, and return them. The lock is only held for the duration of this claim.
+
+    An email whose worker dies before recording the result is sent again once the claim expires.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects
+            .select_for_update(skip_locked=connection.features.has_select_for_update_skip_locked)
+            .filter(status=OutgoingEmail.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        if emails:
+            OutgoingEmail.objects.filter(pk__in=[email.pk for email in emails]).update(
+                next_attempt_at=timezone.now() + timedelta(seconds=claim_timeout))
+    return emails
+
+
+def send_queued_emails(batch_size=None, max_attempts=None, backoff=None, claim_timeout=None):
+    """
+    Send one batch of due emails over a single backend connection and return (sent, failed).
+    Failed emails are retried with an exponential backoff and given up after `max_attempts` attempts.
+
+    The batch is claimed first with SELECT ... FOR UPDATE SKIP LOCKED where the database supports it, so several
+    workers can drain the outbox side by side. The emails are sent outside of any transaction.
+    """
+    options = getattr(settings, 'EMAIL_OUTBOX', {})
+    batch_size = batch_size or options.get('BATCH_SIZE', 50)
+    max_attempts = max_attempts or options.get('MAX_ATTEMPTS', 5)
+    backoff = backoff if backoff is not None else options.get('RETRY_BACKOFF', 60)
+    claim_timeout = claim_timeout if claim_timeout is not None else options.get('CLAIM_TIMEOUT', 300)
+
+    sent = failed = 0
+    emails = claim_due_emails(batch_size, claim_timeout)
+    if not emails:
+        return sent, failed
+
+    backend = get_connection(fail_silently=False)
+    try:
+        backend.open()
+        opened = True
+    except Exception as e:
+        opened = False
+        error = f"Could not connect to the email backend: {e}"
+
+    try:
+        for email in emails:
+            now = timezone.now()
+            email.attempts += 1
+            if opened:
+                message = EmailMessage(email.subject, email.body, email.from_email, email.to,
+                                       connection=backend)
+                message.content_subtype = email.content_subtype
+                try:
+                    message.send()
+                    error = None
+                except Exception as e:
+                    error = str(e)
+
+            if error is None:
+                email.status = OutgoingEmail.Status.SENT
+                email.sent_at = now
+                email.last_error = ''
+                sent += 1
+            else:
+                if email.attempts >= max_attempts:
+                    email.status = OutgoingEmail.Status.FAILED
+                email.next_attempt_at = now + retry_delay(email.attempts, backoff)
+                email.last_error = error
+                failed += 1
+    finally:
+        if opened:
+            backend.close()
+        # Also records the emails handled before an unexpected error, so they are not sent twice.
+        OutgoingEmail.objects.bulk_update(
+            emails, ['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at'])
+
+    return sent, failed
@@ -1,3 +1,222 @@
-from django.test import TestCase
+import os
+import tempfile
+from smtplib import SMTPException
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.core import mail
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from io import StringIO
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from account.authentication import get_token_user_cache
+from account.models import UserProfile, OutgoingEmail
+from account.outbox import claim_due_emails, send_queued_emails
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CreateUsersCommandTest(TestCase):
+    def setUp(self):
+        handle, self.output_file = tempfile.mkstemp()
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.output_file)
+
+    def test_bulk_create_users(self):
+        UserProfile.objects.create(username='admin', email='admin@example.com')
+
+        call_command('create_users', 25, self.output_file, bulk=True, batch_size=10, stdout=StringIO())
+
+        self.assertEqual(UserProfile.objects.count(), 26)
+        self.assertEqual(Token.objects.count(), 26)
+
+        with open(self.output_file) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(lines), 25)
+
+        username, password = lines[0].replace('Username: ', '').split(', Password: ')
+        self.assertIsNotNone(authenticate(username=username, password=password))
+
+    def test_bulk_create_users_with_shared_password(self):
+        call_command('create_users', 5, self.output_file, bulk=True, password='load-test', stdout=StringIO())
+
+        self.assertEqual(UserProfile.objects.count(), 5)
+        for user in UserProfile.objects.all():
+            self.assertTrue(user.check_password('load-test'))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CachedTokenAuthenticationTest(APITestCase):
+    def setUp(self):
+        get_token_user_cache().local.clear()
+        self.user = UserProfile.objects.create_user(username='user', email='user@example.com', password='secret')
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('account:userprofile-detail', kwargs={'pk': self.user.pk})
+
+    def test_cached_token_skips_token_query(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for query in queries.captured_queries:
+            self.assertNotIn(Token._meta.db_table, query['sql'])
+
+    def test_logout_invalidates_cached_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        response = self.client.post(reverse('account:logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_change_invalidates_cached_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(AUTH_TOKEN_CACHE={'CACHE_ALIAS': 'default', 'LOCAL_TIMEOUT': 10})
+    def test_shared_cache(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+
+        # A worker without a local entry is served by the shared cache.
+        get_token_user_cache().local.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        for query in queries.captured_queries:
+            self.assertNotIn(Token._meta.db_table, query['sql'])
+
+        self.token.delete()
+        get_token_user_cache().local.clear()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class UserLoginApiViewTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create_user(username='user', email='user@example.com', password='secret')
+        self.url = reverse('account:login')
+
+    def test_login(self):
+        # user, token and the last_login UPDATE
+        with self.assertNumQueries(3):
+            response = self.client.post(self.url, {'username': 'user', 'password': 'secret'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token'], Token.objects.get(user=self.user).key)
+
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+
+    @override_settings(LAST_LOGIN_UPDATE_INTERVAL=60)
+    def test_repeated_login_skips_last_login_update(self):
+        self.client.post(self.url, {'username': 'user', 'password': 'secret'})
+        self.user.refresh_from_db()
+        last_login = self.user.last_login
+
+        with self.assertNumQueries(2):
+            response = self.client.post(self.url, {'username': 'user', 'password': 'secret'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.last_login, last_login)
+
+    def test_login_invalid_credentials(self):
+        response = self.client.post(self.url, {'username': 'user', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+
+
+class ForgotPasswordOutboxTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create_user(username='user', email='user@example.com', password='secret')
+        self.url = reverse('account:forgot-password')
+
+    def test_forgot_password_queues_email(self):
+        response = self.client.post(self.url, {'email': 'user@example.com'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(mail.outbox), 0)
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.to, ['user@example.com'])
+        self.assertEqual(email.status, OutgoingEmail.Status.PENDING)
+
+        call_command('send_queued_emails', stdout=StringIO())
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+        self.assertEqual(mail.outbox[0].content_subtype, 'html')
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.Status.SENT)
+        self.assertEqual(email.attempts, 1)
+        self.assertIsNotNone(email.sent_at)
+
+    def test_forgot_password_unknown_email(self):
+        response = self.client.post(self.url, {'email': 'unknown@example.com'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+    def test_failed_email_is_retried(self):
+        self.client.post(self.url, {'email': 'user@example.com'})
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=SMTPException('Connection refused')):
+            self.assertEqual(send_queued_emails(backoff=0), (0, 1))
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.Status.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, 'Connection refused')
+
+        self.assertEqual(send_queued_emails(backoff=0), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_email_is_given_up_after_max_attempts(self):
+        self.client.post(self.url, {'email': 'user@example.com'})
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                        side_effect=SMTPException('Connection refused')):
+            for _ in range(2):
+                send_queued_emails(max_attempts=2, backoff=0)
+
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.Status.FAILED)
+        self.assertEqual(send_queued_emails(backoff=0), (0, 0))
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_batch_is_sent_over_one_connection(self):
+        for index in range(3):
+            OutgoingEmail.objects.create(subject='Subject', body='Body', to=[f'user{index}@example.com'])
+
+        with mock.patch('account.outbox.get_connection', wraps=mail.get_connection) as get_connection:
+            self.assertEqual(send_queued_emails(batch_size=10), (3, 0))
+        self.assertEqual(get_connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_claimed_batch_is_skipped_by_other_workers(self):
+        self.client.post(self.url, {'email': 'user@example.com'})
+        claimed_by_others = []
+
+        def send_messages(messages):
+            claimed_by_others.extend(claim_due_emails(batch_size=10, claim_timeout=300))
+            return len(messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=send_messages):
+            self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(claimed_by_others, [])
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.Status.SENT)
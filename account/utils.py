@@ -1,8 +1,29 @@
-from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 from django.conf import settings
+from django.utils import timezone
+
+from account.models import UserProfile
+from account.outbox import enqueue_email
+
+
+def record_last_login(user):
+    """
+    Store the login time with an UPDATE of the last_login column only. Logins closer than
+    LAST_LOGIN_UPDATE_INTERVAL seconds to the stored one are not written at all.
+    """
+    now = timezone.now()
+    interval = getattr(settings, 'LAST_LOGIN_UPDATE_INTERVAL', 0)
+    if user.last_login is not None and (now - user.last_login).total_seconds() < interval:
+        return
+
+    UserProfile.objects.filter(pk=user.pk).update(last_login=now)
+    user.last_login = now
+
 
 def send_reset_email(email, token, name):
+    """
+    Queue the password reset email in the outbox; the send_queued_emails command delivers it.
+    """
     subject = "Your account verification email"
     email_from = settings.EMAIL_HOST_USER
 
@@ -10,10 +31,4 @@ def send_reset_email(email, token, name):
     html_message = render_to_string(html_template, context={'token': token, 'name': name})
     recipient_list = [email]
 
-    try:
-        message = EmailMessage(subject, html_message, email_from, recipient_list)
-        message.content_subtype = 'html'
-        message.send()
-        return {"is_sent": True}
-    except Exception as e:
-        return {"is_sent": False, "message": f"An error occurred while sending the email: {str(e)}"}
+    return enqueue_email(subject, html_message, recipient_list, email_from, content_subtype='html')
@@ -1,5 +1,4 @@
 from rest_framework import viewsets, filters, status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
@@ -8,20 +7,23 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
 from account import models, serializers, permissions
-from django.utils import timezone
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 
-from account.utils import send_reset_email
+from account.authentication import CachedTokenAuthentication
+from account.utils import send_reset_email, record_last_login
+from QuizAPI.pagination import IdCursorPagination
 
 
 class UserViewSets(viewsets.ModelViewSet):
     queryset = models.UserProfile.objects.all()
     serializer_class = serializers.UserSerializer
     permission_classes = (permissions.UpdateOwnProfile,)
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     filter_backends = (filters.SearchFilter, filters.OrderingFilter,)
     ordering_fields = ('id',)
+    ordering = ('id',)
+    pagination_class = IdCursorPagination
     search_fields = ('username', 'email',)
 
     def destroy(self, request, *args, **kwargs):
@@ -35,18 +37,17 @@ class UserLoginApiView(ObtainAuthToken):
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, created = Token.objects.get_or_create(user=user)
+        record_last_login(user)
 
-        if response.status_code == 200:
-            user = Token.objects.get(key=response.data['token']).user
-            user.last_login = timezone.now()
-            user.save()
-
-        return response
+        return Response({'token': token.key})
 
 
 class LogoutView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -66,11 +67,8 @@ class ForgotPasswordView(APIView):
             user = models.UserProfile.objects.get(email=email)
             token, created = Token.objects.get_or_create(user=user)
             encoded_token = urlsafe_base64_encode(force_bytes(token.key))
-            data = send_reset_email(email, encoded_token, user.username)
-            if data.get('is_sent'):
-                return Response({'message': "Reset link is sent to your email"}, status=status.HTTP_200_OK)
-            else:
-                return Response({'message': data.get('message')}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            send_reset_email(email, encoded_token, user.username)
+            return Response({'message': "Reset link is sent to your email"}, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
@@ -1,8 +1,9 @@
 from django.contrib import admin
-from quiz.models import Feedback, Participant, Answer, Question, Quiz, Tag, Category
+from quiz.models import Feedback, Participant, QuizAttempt, Answer, Question, Quiz, Tag, Category
 
 admin.site.register(Feedback)
 admin.site.register(Participant)
+admin.site.register(QuizAttempt)
 admin.site.register(Answer)
 admin.site.register(Question)
 admin.site.register(Quiz)
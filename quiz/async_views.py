@@ -0,0 +1,121 @@
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import exceptions, serializers, status
+from rest_framework.settings import api_settings
+
+from account.authentication import CachedTokenAuthentication
+from QuizAPI.parsers import FastJSONParser
+from QuizAPI.renderers import FastJSONRenderer
+from .attempts import start_attempt, submit_attempt
+from .models import Quiz
+from .scoring import aget_answer_key
+from .serializers import SubmissionSerializer, TIME_OVER_ERROR, participant_error
+
+
+class AsyncAPIView(View):
+    """
+    Minimal async counterpart of DRF's APIView: token authentication, JSON request and response bodies, and
+    errors shaped like DRF's. Every request must be authenticated.
+    Use Case: Serving the exam hot path from an ASGI worker without a thread pool hop per request.
+    """
+
+    http_method_names = ['post']
+    authentication = CachedTokenAuthentication()
+    parser = FastJSONParser()
+    renderer = FastJSONRenderer()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Authentication is by token only, like the DRF views.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method.lower() not in self.http_method_names:
+                raise exceptions.MethodNotAllowed(request.method)
+            await self.authenticate(request)
+            request.data = self.parse(request)
+            return await getattr(self, request.method.lower())(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return self.handle_exception(exc)
+
+    async def authenticate(self, request):
+        credentials = await self.authentication.aauthenticate(request)
+        if credentials is None:
+            raise exceptions.NotAuthenticated()
+        request.user, request.auth = credentials
+
+    def parse(self, request):
+        if not request.body:
+            return {}
+        if request.content_type != self.parser.media_type:
+            raise exceptions.UnsupportedMediaType(request.content_type)
+        parser_context = {'encoding': request.encoding or settings.DEFAULT_CHARSET}
+        return self.parser.parse(BytesIO(request.body), parser_context=parser_context)
+
+    def respond(self, data, status=status.HTTP_200_OK):
+        return HttpResponse(self.renderer.render(data), status=status, content_type=self.renderer.media_type)
+
+    def handle_exception(self, exc):
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = self.respond(data, status=exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            # As DRF does when the first authentication class has an authentication header.
+            response.status_code = status.HTTP_401_UNAUTHORIZED
+            response['WWW-Authenticate'] = self.authentication.authenticate_header(None)
+        return response
+
+
+class AsyncStartQuizView(AsyncAPIView):
+    """
+    Async version of StartQuizView. The writes, which need a transaction, run in a thread.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        quiz_id = request.data.get('quiz_id')
+
+        try:
+            time_limit = await Quiz.objects.filter(id=quiz_id).values_list('time_limit', flat=True).afirst()
+        except (TypeError, ValueError):
+            time_limit = None
+
+        if time_limit is None:
+            return self.respond({'quiz_id': 'Invalid quiz ID'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Django runs transactions in sync code only.
+        await sync_to_async(start_attempt)(request.user, quiz_id, time_limit)
+
+        return self.respond({'message': 'Quiz started successfully'})
+
+
+class AsyncSubmitQuizView(AsyncAPIView):
+    """
+    Async version of SubmitQuizView. Only the writes, which need a transaction, and the explanation of a refused
+    submission run in a thread.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        serializer = SubmissionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quiz_id = serializer.validated_data['quiz_id']
+
+        user = request.user
+        answer_key = await aget_answer_key(quiz_id)
+        try:
+            score = answer_key.score(serializer.validated_data['answers'])
+        except serializers.ValidationError as exc:
+            error = await sync_to_async(participant_error)(user, quiz_id)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [error] if error else exc.detail})
+
+        if not await sync_to_async(submit_attempt)(user, quiz_id, score):
+            error = await sync_to_async(participant_error)(user, quiz_id) or TIME_OVER_ERROR
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [error]})
+
+        data = SubmissionSerializer(dict(serializer.validated_data, score=score)).data
+        return self.respond({'message': 'Quiz submitted successfully', 'data': data})
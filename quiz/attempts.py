@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Subquery
+from django.utils import timezone
+
+from .leaderboard import record_score
+from .models import Participant, QuizAttempt
+
+
+def latest_attempt(user, quiz_id):
+    """
+    Queryset of the latest attempt of a user at a quiz, read from attempt_history_idx.
+    """
+    return QuizAttempt.objects.filter(user=user, quiz_id=quiz_id).order_by('-started_at', '-id')[:1]
+
+
+def start_attempt(user, quiz_id, time_limit):
+    """
+    Record a new attempt of a user at a quiz, and their participant on the first one.
+    """
+    start_time = timezone.now()
+    end_time = start_time + timedelta(minutes=time_limit)
+
+    with transaction.atomic():
+        attempt = QuizAttempt.objects.create(user=user, quiz_id=quiz_id, started_at=start_time, end_time=end_time)
+
+        # INSERT ... ON CONFLICT DO NOTHING: a retake leaves the participant row alone, the deadline and the
+        # score of the retake live on its attempt.
+        Participant.objects.bulk_create(
+            [Participant(user=user, quiz_id=quiz_id, start_time=start_time, end_time=end_time, score=None)],
+            ignore_conflicts=True,
+        )
+    return attempt
+
+
+def submit_attempt(user, quiz_id, score):
+    """
+    Record the score of the latest attempt of a user at a quiz and update the leaderboard, in one transaction.
+    Return False, without writing anything, when the attempt's time is over.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # The deadline is checked by the UPDATE itself, so it cannot pass between a read and the write.
+        updated = QuizAttempt.objects.filter(
+            pk=Subquery(latest_attempt(user, quiz_id).values('pk')), end_time__gte=now,
+        ).update(score=score, submitted_at=now)
+        if not updated:
+            return False
+
+        Participant.objects.filter(user=user, quiz_id=quiz_id).update(score=score)
+        record_score(quiz_id, user.id, score)
+    return True
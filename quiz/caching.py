@@ -0,0 +1,33 @@
+# Namespaces of the cached responses of the quiz views, see QuizAPI.response_cache.
+# The receivers of quiz.signals invalidate them on writes.
+
+CATEGORIES = 'categories'
+TAGS = 'tags'
+# Any quiz, for the ETag of the quiz list (quiz.conditional.quiz_list_state): bumped with every quiz namespace.
+QUIZZES = 'quizzes'
+# Links between quizzes and categories or tags, which are removed without m2m_changed when those are deleted.
+QUIZ_LINKS = 'quiz-links'
+
+
+def quiz_namespace(quiz_id):
+    return f'quiz:{quiz_id}'
+
+
+def category_namespaces(request, *args, **kwargs):
+    return [CATEGORIES]
+
+
+def tag_namespaces(request, *args, **kwargs):
+    return [TAGS]
+
+
+def quiz_namespaces(request, pk, *args, **kwargs):
+    return [quiz_namespace(pk), QUIZ_LINKS]
+
+
+def quiz_list_namespaces(request, *args, **kwargs):
+    namespaces = [QUIZZES, QUIZ_LINKS]
+    if request.GET.get('facets') == 'true':
+        # Facets show the names of the categories and tags.
+        namespaces += [CATEGORIES, TAGS]
+    return namespaces
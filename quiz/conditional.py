@@ -0,0 +1,100 @@
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.views.decorators.http import condition
+from rest_framework.exceptions import ValidationError
+
+from QuizAPI.response_cache import get_response_cache
+from .caching import quiz_list_namespaces
+from .filters import filter_quizzes
+from .models import Category, Tag, Quiz, Question
+
+
+def conditional_get(state_func):
+    """
+    Decorator answering GET requests with a 304 when the If-None-Match / If-Modified-Since headers still match,
+    before the view queries and serializes anything.
+    `state_func(request, *args, **kwargs)` returns the (etag, last_modified) of the resource, or None when it
+    does not exist; it is called at most once per request.
+    """
+
+    def state(request, *args, **kwargs):
+        if not hasattr(request, '_conditional_state'):
+            request._conditional_state = state_func(request, *args, **kwargs)
+        return request._conditional_state
+
+    def etag(request, *args, **kwargs):
+        resource = state(request, *args, **kwargs)
+        return resource[0] if resource else None
+
+    def last_modified(request, *args, **kwargs):
+        resource = state(request, *args, **kwargs)
+        return resource[1] if resource else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def list_etag(request, *parts):
+    """
+    ETag of a list page: the state of the listed rows, and the query string that selected them.
+    """
+    value = '|'.join(str(part) for part in (request.get_full_path(), *parts))
+    return f'"{hashlib.md5(value.encode()).hexdigest()}"'
+
+
+def quiz_list_state(request, *args, **kwargs):
+    try:
+        filter_quizzes(Quiz.objects.all(), request.GET)
+    except ValidationError:
+        # Let the view answer with the validation error.
+        return None
+
+    # The generations of the response cache change with every write to a quiz or its links, so this costs no
+    # query. Deletions do not move any updated_at, so lists only have an ETag.
+    return list_etag(request, *get_response_cache().generations(quiz_list_namespaces(request))), None
+
+
+def quiz_state(request, pk, *args, **kwargs):
+    quiz = Quiz.objects.filter(pk=pk).values_list('version', 'updated_at').first()
+    if quiz is None:
+        return None
+
+    version, updated_at = quiz
+    return f'"quiz-{pk}-{version}-{updated_at.timestamp()}"', updated_at
+
+
+def question_list_state(request, pk, *args, **kwargs):
+    quiz = quiz_state(request, pk)
+    if quiz is None:
+        return None
+    return list_etag(request, quiz[0]), quiz[1]
+
+
+def question_state(request, pk, *args, **kwargs):
+    # Every change of a question or of its answers bumps the version of its quiz.
+    quiz = Question.objects.filter(pk=pk).values_list('quiz_id', 'quiz__version', 'quiz__updated_at').first()
+    if quiz is None:
+        return None
+
+    quiz_id, version, updated_at = quiz
+    return f'"question-{pk}-{quiz_id}-{version}-{updated_at.timestamp()}"', updated_at
+
+
+def category_list_state(request, *args, **kwargs):
+    state = Category.objects.aggregate(count=Count('id'), last=Max('updated_at'))
+    return list_etag(request, state['count'], state['last']), None
+
+
+def tag_list_state(request, *args, **kwargs):
+    state = Tag.objects.aggregate(count=Count('id'), last=Max('updated_at'))
+    return list_etag(request, state['count'], state['last']), None
+
+
+def category_state(request, pk, *args, **kwargs):
+    updated_at = Category.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return (f'"category-{pk}-{updated_at.timestamp()}"', updated_at) if updated_at else None
+
+
+def tag_state(request, pk, *args, **kwargs):
+    updated_at = Tag.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return (f'"tag-{pk}-{updated_at.timestamp()}"', updated_at) if updated_at else None
@@ -0,0 +1,113 @@
+import gzip
+import hashlib
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from QuizAPI.cache import VersionedCache
+from QuizAPI.renderers import FastJSONRenderer
+from .models import Quiz, Question, Answer
+
+
+class DeliveryPayload:
+    """
+    Rendered taker-facing representation of a quiz: its questions and answers, without the correct ones.
+    Use Case: Answering the whole class opening an exam at once with a copy of the same bytes.
+    """
+
+    __slots__ = ('quiz_id', 'content', 'gzipped', 'etag', 'gzipped_etag')
+
+    def __init__(self, quiz_id, content, gzipped=None):
+        self.quiz_id = quiz_id
+        self.content = content
+        # None when compressing does not pay off.
+        self.gzipped = gzipped
+        # Every encoding is a representation of its own, with its own strong ETag.
+        digest = hashlib.md5(content).hexdigest()
+        self.etag = f'"delivery-{quiz_id}-{digest}"'
+        self.gzipped_etag = f'"delivery-{quiz_id}-{digest}-gzip"'
+
+
+def load_delivery_payload(quiz_id, compress=True, compress_min_bytes=1024):
+    """
+    Render the delivery payload of a quiz with three queries, or return None when the quiz does not exist.
+    """
+    quiz = Quiz.objects.filter(pk=quiz_id).values('id', 'title', 'description', 'time_limit').first()
+    if quiz is None:
+        return None
+
+    questions = {
+        question['id']: dict(question, answers=[])
+        for question in Question.objects.filter(quiz_id=quiz_id).order_by('id')
+        .values('id', 'text', 'type', 'points')
+    }
+    answers = Answer.objects.filter(question__quiz_id=quiz_id).order_by('id').values_list('id', 'question_id', 'text')
+    for answer_id, question_id, text in answers:
+        questions[question_id]['answers'].append({'id': answer_id, 'text': text})
+    quiz['questions'] = list(questions.values())
+
+    content = FastJSONRenderer().render(quiz)
+    gzipped = None
+    if compress and len(content) >= compress_min_bytes:
+        # mtime=0 keeps the compressed bytes identical in every worker.
+        gzipped = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(gzipped) >= len(content):
+            gzipped = None
+    return DeliveryPayload(quiz_id, content, gzipped)
+
+
+class DeliveryCache(VersionedCache):
+    """
+    Per-quiz delivery payload cache, see VersionedCache.
+    Use Case: Rendering a quiz once per content change instead of once per taker.
+    """
+
+    prefix = 'quiz:delivery'
+
+    def __init__(self, max_entries=128, local_timeout=5, cache_alias=None, timeout=None, compress=True,
+                 compress_min_bytes=1024):
+        super().__init__(max_entries=max_entries, local_timeout=local_timeout, cache_alias=cache_alias,
+                         timeout=timeout)
+        self.compress = compress
+        self.compress_min_bytes = compress_min_bytes
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'QUIZ_DELIVERY_CACHE', {})
+        return cls(
+            max_entries=options.get('MAX_ENTRIES', 128),
+            local_timeout=options.get('LOCAL_TIMEOUT', 5),
+            cache_alias=options.get('CACHE_ALIAS'),
+            timeout=options.get('TIMEOUT'),
+            compress=options.get('GZIP', True),
+            compress_min_bytes=options.get('GZIP_MIN_BYTES', 1024),
+        )
+
+    def load(self, quiz_id):
+        return load_delivery_payload(quiz_id, self.compress, self.compress_min_bytes)
+
+
+_delivery_cache = None
+
+
+def get_delivery_cache():
+    global _delivery_cache
+    if _delivery_cache is None:
+        _delivery_cache = DeliveryCache.from_settings()
+    return _delivery_cache
+
+
+def get_delivery_payload(quiz_id):
+    return get_delivery_cache().get(quiz_id)
+
+
+def invalidate_delivery_payload(quiz_id):
+    get_delivery_cache().invalidate(quiz_id)
+
+
+@receiver(setting_changed)
+def reset_delivery_cache(setting, **kwargs):
+    global _delivery_cache
+    if setting == 'QUIZ_DELIVERY_CACHE':
+        _delivery_cache = None
@@ -0,0 +1,82 @@
+from django.db.models import Count, Value
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Quiz
+
+QuizCategory = Quiz.categories.through
+QuizTag = Quiz.tags.through
+
+MATCH_ANY = 'any'
+MATCH_ALL = 'all'
+
+
+def parse_ids(value, name):
+    try:
+        return sorted({int(pk) for pk in value.split(',') if pk.strip()})
+    except ValueError:
+        raise serializers.ValidationError({name: 'A comma separated list of IDs is required.'})
+
+
+def quizzes_with(through, column, ids, match):
+    """
+    Subquery of the ids of the quizzes linked to any or all of `ids`, answered from the through table alone.
+    """
+    links = through.objects.filter(**{f'{column}__in': ids})
+    if match == MATCH_ALL and len(ids) > 1:
+        links = links.values('quiz_id').annotate(matched=Count('quiz_id')).filter(matched=len(ids))
+    return links.values('quiz_id')
+
+
+def filter_quizzes(queryset, params):
+    """
+    Filter quizzes with the `categories` and `tags` query parameters (comma separated IDs).
+    With `match=any` (the default) a quiz needs one of the categories and one of the tags, with `match=all`
+    it needs every one of them.
+    """
+    match = params.get('match', MATCH_ANY)
+    if match not in (MATCH_ANY, MATCH_ALL):
+        raise serializers.ValidationError({'match': f"Must be '{MATCH_ANY}' or '{MATCH_ALL}'."})
+
+    categories = parse_ids(params.get('categories', ''), 'categories')
+    tags = parse_ids(params.get('tags', ''), 'tags')
+
+    if categories:
+        queryset = queryset.filter(id__in=quizzes_with(QuizCategory, 'category_id', categories, match))
+    if tags:
+        queryset = queryset.filter(id__in=quizzes_with(QuizTag, 'tag_id', tags, match))
+    return queryset
+
+
+def facet_counts(queryset):
+    """
+    Number of quizzes of `queryset` per category and per tag, computed by a single UNION ALL query.
+    """
+    quiz_ids = queryset.order_by().values('id')
+    categories = (QuizCategory.objects
+                  .filter(quiz_id__in=quiz_ids)
+                  .values('category_id', 'category__name')
+                  .annotate(facet=Value('categories'), count=Count('quiz_id'))
+                  .values_list('facet', 'category_id', 'category__name', 'count'))
+    tags = (QuizTag.objects
+            .filter(quiz_id__in=quiz_ids)
+            .values('tag_id', 'tag__name')
+            .annotate(facet=Value('tags'), count=Count('quiz_id'))
+            .values_list('facet', 'tag_id', 'tag__name', 'count'))
+
+    facets = {'categories': [], 'tags': []}
+    for facet, pk, name, count in categories.union(tags, all=True):
+        facets[facet].append({'id': pk, 'name': name, 'count': count})
+    for values in facets.values():
+        values.sort(key=lambda value: (-value['count'], value['id']))
+    return facets
+
+
+class QuizFacetFilter(BaseFilterBackend):
+    """
+    Filter backend applying filter_quizzes to the query parameters of the request.
+    Use Case: Narrowing the quiz list by categories and tags on the server instead of the client.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return filter_quizzes(queryset, request.query_params)
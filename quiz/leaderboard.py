@@ -0,0 +1,80 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import LeaderboardEntry, ScoreBucket
+
+
+def _increment_bucket(quiz_id, score):
+    updated = ScoreBucket.objects.filter(quiz_id=quiz_id, score=score).update(count=F('count') + 1)
+    if updated:
+        return
+
+    try:
+        with transaction.atomic():
+            ScoreBucket.objects.create(quiz_id=quiz_id, score=score, count=1)
+    except IntegrityError:
+        # Created by a concurrent submission in the meantime.
+        ScoreBucket.objects.filter(quiz_id=quiz_id, score=score).update(count=F('count') + 1)
+
+
+def forget_score(quiz_id, score):
+    """
+    Remove a deleted leaderboard entry from the score buckets of its quiz.
+    """
+    ScoreBucket.objects.filter(quiz_id=quiz_id, score=score).update(count=F('count') - 1)
+
+
+def record_score(quiz_id, user_id, score):
+    """
+    Incrementally update the leaderboard of a quiz with the latest score of a user.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        entry = LeaderboardEntry.objects.select_for_update().filter(quiz_id=quiz_id, user_id=user_id).first()
+        if entry is None:
+            try:
+                with transaction.atomic():
+                    LeaderboardEntry.objects.create(quiz_id=quiz_id, user_id=user_id, score=score, submitted_at=now)
+            except IntegrityError:
+                # A concurrent submission of the same user won the race, retry as an update of its entry.
+                return record_score(quiz_id, user_id, score)
+        else:
+            LeaderboardEntry.objects.filter(pk=entry.pk).update(score=score, submitted_at=now)
+            if entry.score == score:
+                return
+            ScoreBucket.objects.filter(quiz_id=quiz_id, score=entry.score).update(count=F('count') - 1)
+
+        _increment_bucket(quiz_id, score)
+
+
+def top_entries(quiz_id, limit):
+    """
+    Return the best `limit` entries of a quiz with their competition rank ("1224" ranking).
+    """
+    entries = (LeaderboardEntry.objects
+               .filter(quiz_id=quiz_id)
+               .order_by('-score', 'submitted_at')
+               .select_related('user')[:limit])
+
+    ranking = []
+    for position, entry in enumerate(entries, start=1):
+        rank = ranking[-1]['rank'] if ranking and ranking[-1]['score'] == entry.score else position
+        ranking.append({
+            'rank': rank,
+            'user_id': entry.user_id,
+            'username': entry.user.username,
+            'score': entry.score,
+        })
+    return ranking
+
+
+def rank_of(quiz_id, score):
+    """
+    Return the rank of `score` in a quiz and the number of ranked users, with one query on the score buckets.
+    """
+    totals = ScoreBucket.objects.filter(quiz_id=quiz_id).aggregate(
+        total=Sum('count'),
+        better=Sum('count', filter=Q(score__gt=score)),
+    )
+    return (totals['better'] or 0) + 1, totals['total'] or 0
@@ -0,0 +1,191 @@
+import json
+import math
+import os
+import random
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand, call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+
+from QuizAPI.renderers import FastJSONRenderer
+
+from account.models import UserProfile
+from quiz.models import Quiz, Answer, Participant, Feedback
+from quiz.serializers import QuizSerializer
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(math.ceil(percent / 100 * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def summarize(timings, query_counts):
+    total = sum(timings)
+    return {
+        'requests': len(timings),
+        'p50_ms': round(percentile(timings, 50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 95) * 1000, 3),
+        'mean_ms': round(total / len(timings) * 1000, 3),
+        'requests_per_second': round(len(timings) / total, 1) if total else None,
+        'queries_per_request': round(sum(query_counts) / len(query_counts), 2),
+        'max_queries': max(query_counts),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main endpoints in-process against a freshly seeded test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Number of users to seed')
+        parser.add_argument('--quizzes', type=int, default=20, help='Number of quizzes to seed')
+        parser.add_argument('--questions', type=int, default=25, help='Number of questions per quiz')
+        parser.add_argument('--feedback', type=int, default=20, help='Number of feedback entries per quiz')
+        parser.add_argument('--iterations', type=int, default=100, help='Number of requests per scenario')
+        parser.add_argument('--render-questions', type=int, default=500,
+                            help='Number of questions of the quiz used to compare the JSON renderers, 0 to skip')
+        parser.add_argument('--seed', type=int, default=42, help='Seed of the data and of the request mix')
+        parser.add_argument('--output', type=str, default='benchmark.json', help='Path of the JSON report')
+        parser.add_argument('--label', type=str, default=None, help='Label stored in the report')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self.seed(options)
+            results = self.run_scenarios(options)
+            if options['render_questions']:
+                results.update(self.run_render_scenarios(options))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'label': options['label'],
+            'commit': git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'scale': {
+                'users': options['users'],
+                'quizzes': options['quizzes'],
+                'questions_per_quiz': options['questions'],
+                'feedback_per_quiz': options['feedback'],
+                'iterations': options['iterations'],
+                'render_questions': options['render_questions'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+
+        with open(options['output'], 'w') as file:
+            json.dump(report, file, indent=2)
+
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<15} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms  "
+                f"{result['requests_per_second']:>8} req/s  {result['queries_per_request']:>6} queries/req")
+        self.stdout.write(self.style.SUCCESS(f"Benchmark report saved to {options['output']}"))
+
+    def seed(self, options):
+        with open(os.devnull, 'w') as quiet:
+            call_command('create_users', options['users'], os.devnull, bulk=True, password='benchmark', stdout=quiet)
+            call_command('create_categories', 5, stdout=quiet)
+            call_command('create_tags', 5, stdout=quiet)
+            call_command('create_quizzes', options['quizzes'], options['questions'], seed=options['seed'],
+                         stdout=quiet)
+
+        now = timezone.now()
+        users = list(UserProfile.objects.order_by('id'))
+        for quiz in Quiz.objects.all():
+            participants = Participant.objects.bulk_create([
+                Participant(user=user, quiz=quiz, start_time=now, end_time=now, score=0)
+                for user in users[:options['feedback']]
+            ])
+            Feedback.objects.bulk_create([
+                Feedback(participant=participant, quiz=quiz, rating=1 + index % 5, comment='Benchmark feedback')
+                for index, participant in enumerate(participants)
+            ])
+
+    def run_scenarios(self, options):
+        rng = random.Random(options['seed'])
+        iterations = options['iterations']
+
+        quiz_ids = list(Quiz.objects.values_list('id', flat=True))
+        answers = {}
+        for answer_id, question_id, quiz_id in Answer.objects.values_list('id', 'question_id', 'question__quiz_id'):
+            answers.setdefault(quiz_id, {}).setdefault(question_id, []).append(answer_id)
+
+        tokens = list(Token.objects.order_by('user_id').values_list('key', flat=True))
+        clients = [Client(HTTP_AUTHORIZATION=f'Token {key}') for key in tokens]
+
+        def measure(name, make_request):
+            timings, query_counts = [], []
+            for index in range(iterations):
+                with CaptureQueriesContext(connection) as queries:
+                    started_at = time.perf_counter()
+                    response = make_request(index)
+                    timings.append(time.perf_counter() - started_at)
+                if response.status_code >= 400:
+                    raise RuntimeError(f"{name} failed with status {response.status_code}: {response.content[:200]}")
+                query_counts.append(len(queries))
+            return summarize(timings, query_counts)
+
+        def submit_data(quiz_id):
+            return {
+                'quiz_id': quiz_id,
+                'answers': [
+                    {'question_id': question_id, 'selected_answer': rng.choice(answer_ids)}
+                    for question_id, answer_ids in answers.get(quiz_id, {}).items()
+                ],
+            }
+
+        plan = [(clients[index % len(clients)], rng.choice(quiz_ids)) for index in range(iterations)]
+
+        results = {}
+        results['quiz_list'] = measure('quiz_list', lambda index: plan[index][0].get(
+            reverse('quiz:quiz-list-create')))
+        results['quiz_detail'] = measure('quiz_detail', lambda index: plan[index][0].get(
+            reverse('quiz:quiz-retrieve-update-delete', kwargs={'pk': plan[index][1]})))
+        results['feedback_list'] = measure('feedback_list', lambda index: plan[index][0].get(
+            reverse('quiz:feedback-list-create', kwargs={'pk': plan[index][1]})))
+        results['quiz_start'] = measure('quiz_start', lambda index: plan[index][0].post(
+            reverse('quiz:start-quiz'), {'quiz_id': plan[index][1]}, content_type='application/json'))
+        results['quiz_submit'] = measure('quiz_submit', lambda index: plan[index][0].post(
+            reverse('quiz:submit-quiz'), submit_data(plan[index][1]), content_type='application/json'))
+
+        return results
+
+    def run_render_scenarios(self, options):
+        """
+        Time the stdlib and the fast JSON renderers on the serialized data of one large quiz.
+        """
+        with open(os.devnull, 'w') as quiet:
+            call_command('create_quizzes', 1, options['render_questions'], seed=options['seed'], stdout=quiet)
+        quiz = Quiz.objects.with_content().latest('id')
+        data = QuizSerializer(quiz).data
+
+        results = {}
+        for name, renderer in (('render_stdlib', JSONRenderer()), ('render_fast', FastJSONRenderer())):
+            timings = []
+            for _ in range(options['iterations']):
+                started_at = time.perf_counter()
+                renderer.render(data)
+                timings.append(time.perf_counter() - started_at)
+            results[name] = summarize(timings, [0])
+        return results
@@ -1,6 +1,8 @@
 from django.core.management import BaseCommand
 from faker import Faker
 
+from QuizAPI.response_cache import invalidate_responses
+from quiz.caching import CATEGORIES
 from quiz.models import Category
 
 
@@ -14,7 +16,10 @@ class Command(BaseCommand):
         num_categories = options['num_categories']
         faker = Faker()
 
-        for _ in range(num_categories):
-            Category.objects.get_or_create(name=faker.word().capitalize())
+        # Names already taken, whatever their case, are skipped by the unique index of Category.
+        names = {faker.word().capitalize() for _ in range(num_categories)}
+        Category.objects.bulk_create([Category(name=name) for name in names], ignore_conflicts=True)
+        # bulk_create does not send post_save.
+        invalidate_responses(CATEGORIES)
 
         self.stdout.write(self.style.SUCCESS('Categories have been created...'))
@@ -1,9 +1,115 @@
+from concurrent.futures import ProcessPoolExecutor
+
 from django.core.management import BaseCommand, call_command
+from django.db import transaction
 from faker import Faker
+from quiz.caching import QUIZZES
 from quiz.models import Category, Tag, Quiz, QuestionType, Question, Answer
+from quiz.search import write_documents
 import random
 
 from account.models import UserProfile
+from QuizAPI.response_cache import invalidate_responses
+from QuizAPI.workers import setup_worker
+
+
+def generate_quizzes(seed, chunk_index, num_quizzes, num_questions_per_quiz, user_ids, category_ids, tag_ids):
+    """
+    Generate the data of one chunk of quizzes as plain Python objects.
+    Every chunk is seeded on its own, so the output does not depend on the number of workers.
+    """
+    chunk_seed = f'{seed}:{chunk_index}'
+    rng = random.Random(chunk_seed)
+    faker = Faker()
+    faker.seed_instance(chunk_seed)
+
+    quizzes = []
+    for _ in range(num_quizzes):
+        questions = []
+        for _ in range(num_questions_per_quiz):
+            type = rng.choice([QuestionType.MULTIPLE_CHOICE, QuestionType.TRUE_FALSE])
+
+            if type == QuestionType.MULTIPLE_CHOICE:
+                answers = [(faker.sentence(), True)] + [(faker.sentence(), False) for _ in range(3)]
+            else:
+                answers = [('True', True), ('False', False)]
+            rng.shuffle(answers)
+
+            questions.append({
+                'text': faker.sentence(),
+                'type': str(type),
+                'points': rng.randint(1, 10),
+                'answers': answers,
+            })
+
+        quizzes.append({
+            'title': faker.sentence(),
+            'description': faker.paragraph(),
+            'time_limit': rng.randint(10, 60),
+            'created_by_id': rng.choice(user_ids),
+            'categories': rng.sample(category_ids, min(2, len(category_ids))),
+            'tags': rng.sample(tag_ids, min(3, len(tag_ids))),
+            'questions': questions,
+        })
+
+    return quizzes
+
+
+def insert_quizzes(quizzes_data, batch_size):
+    """
+    Insert a chunk of generated quizzes with batched INSERTs, in one transaction.
+    """
+    QuizCategory = Quiz.categories.through
+    QuizTag = Quiz.tags.through
+
+    with transaction.atomic():
+        quizzes = [
+            Quiz(
+                title=data['title'],
+                description=data['description'],
+                time_limit=data['time_limit'],
+                created_by_id=data['created_by_id'],
+            )
+            for data in quizzes_data
+        ]
+        Quiz.objects.bulk_create(quizzes, batch_size=batch_size)
+
+        quiz_categories = []
+        quiz_tags = []
+        questions = []
+        questions_answers = []
+        for quiz, data in zip(quizzes, quizzes_data):
+            quiz_categories += [QuizCategory(quiz_id=quiz.id, category_id=pk) for pk in data['categories']]
+            quiz_tags += [QuizTag(quiz_id=quiz.id, tag_id=pk) for pk in data['tags']]
+
+            for question_data in data['questions']:
+                questions.append(Question(
+                    quiz_id=quiz.id,
+                    text=question_data['text'],
+                    type=question_data['type'],
+                    points=question_data['points'],
+                ))
+                questions_answers.append(question_data['answers'])
+
+        QuizCategory.objects.bulk_create(quiz_categories, batch_size=batch_size)
+        QuizTag.objects.bulk_create(quiz_tags, batch_size=batch_size)
+        Question.objects.bulk_create(questions, batch_size=batch_size)
+
+        answers = [
+            Answer(question_id=question.id, text=text, is_correct=is_correct)
+            for question, question_answers in zip(questions, questions_answers)
+            for text, is_correct in question_answers
+        ]
+        Answer.objects.bulk_create(answers, batch_size=batch_size)
+
+        # bulk_create does not send post_save, the quizzes are indexed from the generated data instead.
+        write_documents([
+            (quiz.id, data['title'], data['description'],
+             '\n'.join(question_data['text'] for question_data in data['questions']))
+            for quiz, data in zip(quizzes, quizzes_data)
+        ])
+
+    return len(answers)
 
 
 class Command(BaseCommand):
@@ -12,11 +118,21 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('num_quizzes', type=int, help='Number of quizzes to create')
         parser.add_argument('num_questions_per_quiz', type=int, help='Number of questions per quiz')
+        parser.add_argument('--seed', type=int, default=None,
+                            help='Seed of the random generators, the same seed produces the same data')
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Number of quizzes generated and inserted per transaction')
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Number of processes generating the data')
 
     def handle(self, *args, **options):
         num_quizzes = options['num_quizzes']
         num_questions_per_quiz = options['num_questions_per_quiz']
-        faker = Faker()
+        batch_size = options['batch_size']
+        workers = options['workers']
+        seed = options['seed']
+        if seed is None:
+            seed = random.randrange(2 ** 32)
 
         if not UserProfile.objects.exists():
             call_command('create_users', 10, 'users.txt')
@@ -27,57 +143,35 @@ class Command(BaseCommand):
         if not Category.objects.exists():
             call_command('create_categories', 5)
 
-        # Create quizzes
-        for _ in range(num_quizzes):
-            title = faker.sentence()
-            description = faker.paragraph()
-            time_limit = faker.random_int(min=10, max=60)
-            created_by = UserProfile.objects.order_by('?').first()
-            categories = Category.objects.order_by('?')[:2]
-            tags = Tag.objects.order_by('?')[:3]
-
-            quiz = Quiz.objects.create(
-                title=title,
-                description=description,
-                time_limit=time_limit,
-                created_by=created_by,
-
-            )
-            quiz.categories.set(categories)
-            quiz.tags.set(tags)
-
-            # Create questions
-            for _ in range(num_questions_per_quiz):
-                text = faker.sentence()
-                type = faker.random_element(
-                    [QuestionType.MULTIPLE_CHOICE, QuestionType.TRUE_FALSE])
-                points = faker.random_int(min=1, max=10)
-
-                question = Question.objects.create(
-                    quiz=quiz,
-                    text=text,
-                    type=type,
-                    points=points,
-                )
-
-                # Create answers
-                if type == QuestionType.MULTIPLE_CHOICE:
-                    answers = [
-                        Answer(question=question, text=faker.sentence(), is_correct=True),
-                        Answer(question=question, text=faker.sentence(), is_correct=False),
-                        Answer(question=question, text=faker.sentence(), is_correct=False),
-                        Answer(question=question, text=faker.sentence(), is_correct=False),
-                    ]
-                elif type == QuestionType.TRUE_FALSE:
-                    answers = [
-                        Answer(question=question, text='True', is_correct=True),
-                        Answer(question=question, text='False', is_correct=False),
-                    ]
-                else:  # QuestionType.OPEN_ENDED
-                    answers = []
-
-                random.shuffle(answers)
-                Answer.objects.bulk_create(answers)
+        # Random picks are made in memory from the ids, instead of one ORDER BY RANDOM() per quiz.
+        user_ids = list(UserProfile.objects.order_by('id').values_list('id', flat=True))
+        category_ids = list(Category.objects.order_by('id').values_list('id', flat=True))
+        tag_ids = list(Tag.objects.order_by('id').values_list('id', flat=True))
+
+        chunks = [
+            (seed, index, min(batch_size, num_quizzes - start), num_questions_per_quiz, user_ids, category_ids,
+             tag_ids)
+            for index, start in enumerate(range(0, num_quizzes, batch_size))
+        ]
+
+        created_quizzes = 0
+        created_answers = 0
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=setup_worker) as executor:
+                generated_chunks = executor.map(generate_quizzes, *zip(*chunks))
+                for quizzes_data in generated_chunks:
+                    created_answers += insert_quizzes(quizzes_data, batch_size)
+                    created_quizzes += len(quizzes_data)
+                    self.stdout.write(f"{created_quizzes}/{num_quizzes} quizzes created")
+        else:
+            for chunk in chunks:
+                quizzes_data = generate_quizzes(*chunk)
+                created_answers += insert_quizzes(quizzes_data, batch_size)
+                created_quizzes += len(quizzes_data)
+                self.stdout.write(f"{created_quizzes}/{num_quizzes} quizzes created")
+        # bulk_create does not send post_save.
+        invalidate_responses(QUIZZES)
 
         self.stdout.write(
-            f"Sample data populated successfully. Created {num_quizzes} quizzes with {num_questions_per_quiz} questions each.")
+            f"Sample data populated successfully. Created {num_quizzes} quizzes with {num_questions_per_quiz} "
+            f"questions each and {created_answers} answers (seed {seed}).")
@@ -1,6 +1,8 @@
 from django.core.management import BaseCommand
 from faker import Faker
 
+from QuizAPI.response_cache import invalidate_responses
+from quiz.caching import TAGS
 from quiz.models import Tag
 
 
@@ -14,7 +16,10 @@ class Command(BaseCommand):
         num_tags = options['num_tags']
         faker = Faker()
 
-        for _ in range(num_tags):
-            Tag.objects.get_or_create(name=faker.word().capitalize())
+        # Names already taken, whatever their case, are skipped by the unique index of Tag.
+        names = {faker.word().capitalize() for _ in range(num_tags)}
+        Tag.objects.bulk_create([Tag(name=name) for name in names], ignore_conflicts=True)
+        # bulk_create does not send post_save.
+        invalidate_responses(TAGS)
 
         self.stdout.write(self.style.SUCCESS('Tags have been created...'))
\ No newline at end of file
@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from quiz.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of the quizzes'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_index()
+
+        self.stdout.write(self.style.SUCCESS(f"Search index rebuilt for {count} quizzes"))
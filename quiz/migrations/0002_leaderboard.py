@@ -0,0 +1,75 @@
+# Generated by Django 4.2.2 on 2026-10-17 17:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+import django.db.models.deletion
+
+
+def fill_leaderboards(apps, schema_editor):
+    """
+    Create the leaderboard entries and score buckets of the scores submitted so far.
+    A user having several participants of a quiz is ranked with the latest scored one. Participants do not record
+    when they submitted, their start time stands in for it.
+    """
+    Participant = apps.get_model('quiz', 'Participant')
+    LeaderboardEntry = apps.get_model('quiz', 'LeaderboardEntry')
+    ScoreBucket = apps.get_model('quiz', 'ScoreBucket')
+    db_alias = schema_editor.connection.alias
+
+    scored = Participant.objects.using(db_alias).filter(score__isnull=False)
+    latest_ids = scored.values('user_id', 'quiz_id').annotate(latest_id=Max('id')).values('latest_id')
+    LeaderboardEntry.objects.using(db_alias).bulk_create([
+        LeaderboardEntry(quiz_id=quiz_id, user_id=user_id, score=score, submitted_at=start_time)
+        for quiz_id, user_id, score, start_time in scored.filter(id__in=latest_ids).order_by('id')
+        .values_list('quiz_id', 'user_id', 'score', 'start_time').iterator()
+    ], batch_size=1000)
+
+    buckets = (LeaderboardEntry.objects.using(db_alias)
+               .values('quiz_id', 'score').annotate(count=Count('id')).values_list('quiz_id', 'score', 'count'))
+    ScoreBucket.objects.using(db_alias).bulk_create([
+        ScoreBucket(quiz_id=quiz_id, score=score, count=count) for quiz_id, score, count in buckets.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='quiz.quiz')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('submitted_at', models.DateTimeField()),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='quiz.quiz')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='scorebucket',
+            constraint=models.UniqueConstraint(fields=('quiz', 'score'), name='unique_score_bucket'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['quiz', '-score', 'submitted_at'], name='leaderboard_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('quiz', 'user'), name='unique_leaderboard_entry'),
+        ),
+        migrations.RunPython(fill_leaderboards, migrations.RunPython.noop),
+    ]
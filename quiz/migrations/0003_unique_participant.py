@@ -0,0 +1,39 @@
+# Generated by Django 4.2.2 on 2026-10-17 17:42
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def merge_duplicate_participants(apps, schema_editor):
+    """
+    Keep the most recent participant of every (user, quiz) pair, moving the feedback of the others to it.
+    """
+    Participant = apps.get_model('quiz', 'Participant')
+    Feedback = apps.get_model('quiz', 'Feedback')
+
+    duplicates = (Participant.objects
+                  .values('user_id', 'quiz_id')
+                  .annotate(count=Count('id'), kept_id=Max('id'))
+                  .filter(count__gt=1))
+
+    for duplicate in duplicates:
+        others = (Participant.objects
+                  .filter(user_id=duplicate['user_id'], quiz_id=duplicate['quiz_id'])
+                  .exclude(id=duplicate['kept_id']))
+        Feedback.objects.filter(participant__in=others).update(participant_id=duplicate['kept_id'])
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_leaderboard'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_participants, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='participant',
+            constraint=models.UniqueConstraint(fields=('user', 'quiz'), name='unique_participant'),
+        ),
+    ]
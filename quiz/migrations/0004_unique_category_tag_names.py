@@ -0,0 +1,59 @@
+# Generated by Django 4.2.2 on 2026-10-17 17:47
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+from django.db.models.functions import Lower
+import django.db.models.functions.text
+
+
+def merge_duplicate_names(apps, model_name, field_name):
+    """
+    Keep the oldest of the rows whose names only differ by case, moving the quizzes of the others to it.
+    """
+    Model = apps.get_model('quiz', model_name)
+    Through = getattr(apps.get_model('quiz', 'Quiz'), field_name).through
+    column = f'{model_name.lower()}_id'
+
+    duplicates = (Model.objects
+                  .annotate(lower_name=Lower('name'))
+                  .values('lower_name')
+                  .annotate(count=Count('id'), kept_id=Min('id'))
+                  .filter(count__gt=1))
+
+    for duplicate in duplicates:
+        others = list(Model.objects
+                      .annotate(lower_name=Lower('name'))
+                      .filter(lower_name=duplicate['lower_name'])
+                      .exclude(id=duplicate['kept_id'])
+                      .values_list('id', flat=True))
+        linked_quizzes = set(Through.objects.filter(**{column: duplicate['kept_id']}).values_list('quiz_id', flat=True))
+        moved_quizzes = set(Through.objects.filter(**{f'{column}__in': others}).values_list('quiz_id', flat=True))
+        Through.objects.bulk_create([
+            Through(quiz_id=quiz_id, **{column: duplicate['kept_id']})
+            for quiz_id in moved_quizzes - linked_quizzes
+        ])
+        Model.objects.filter(id__in=others).delete()
+
+
+def merge_duplicate_categories_and_tags(apps, schema_editor):
+    merge_duplicate_names(apps, 'Category', 'categories')
+    merge_duplicate_names(apps, 'Tag', 'tags')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_unique_participant'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_categories_and_tags, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='unique_category_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='tag',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='unique_tag_name'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+from django.db import migrations
+
+SQLITE_CREATE = (
+    "CREATE VIRTUAL TABLE quiz_search_fts USING fts5("
+    "title, description, questions, tokenize = 'porter unicode61')"
+)
+SQLITE_INSERT = 'INSERT INTO quiz_search_fts (rowid, title, description, questions) VALUES (%s, %s, %s, %s)'
+SQLITE_DROP = 'DROP TABLE IF EXISTS quiz_search_fts'
+
+POSTGRES_CREATE = [
+    'CREATE TABLE quiz_search_document ('
+    'quiz_id bigint PRIMARY KEY REFERENCES quiz_quiz (id) ON DELETE CASCADE, '
+    'document tsvector NOT NULL)',
+    'CREATE INDEX quiz_search_document_idx ON quiz_search_document USING GIN (document)',
+]
+POSTGRES_INSERT = (
+    "INSERT INTO quiz_search_document (quiz_id, document) VALUES (%s, "
+    "setweight(to_tsvector('english', %s), 'A') || "
+    "setweight(to_tsvector('english', %s), 'B') || "
+    "setweight(to_tsvector('english', %s), 'C'))"
+)
+POSTGRES_DROP = 'DROP TABLE IF EXISTS quiz_search_document'
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Create the full-text index of the quizzes and fill it with the existing ones.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        create, insert = [SQLITE_CREATE], SQLITE_INSERT
+    elif vendor == 'postgresql':
+        create, insert = POSTGRES_CREATE, POSTGRES_INSERT
+    else:
+        return
+
+    for sql in create:
+        schema_editor.execute(sql)
+
+    Quiz = apps.get_model('quiz', 'Quiz')
+    Question = apps.get_model('quiz', 'Question')
+    db_alias = schema_editor.connection.alias
+
+    quiz_ids = list(Quiz.objects.using(db_alias).order_by('id').values_list('id', flat=True))
+    with schema_editor.connection.cursor() as cursor:
+        for start in range(0, len(quiz_ids), 500):
+            batch = quiz_ids[start:start + 500]
+            questions = {}
+            for quiz_id, text in (Question.objects.using(db_alias).filter(quiz_id__in=batch)
+                                  .order_by('id').values_list('quiz_id', 'text')):
+                questions.setdefault(quiz_id, []).append(text)
+
+            cursor.executemany(insert, [
+                (quiz_id, title, description, '\n'.join(questions.get(quiz_id, [])))
+                for quiz_id, title, description in Quiz.objects.using(db_alias).filter(id__in=batch)
+                .values_list('id', 'title', 'description')
+            ])
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(SQLITE_DROP)
+    elif vendor == 'postgresql':
+        schema_editor.execute(POSTGRES_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_unique_category_tag_names'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
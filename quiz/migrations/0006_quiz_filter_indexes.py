@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+# The through tables of Quiz.categories and Quiz.tags only have a (quiz_id, x_id) unique index and single column
+# indexes. The filters look up quizzes by category or tag, so (x_id, quiz_id) indexes answer them from the index
+# alone. The facet counts use the existing (quiz_id, x_id) index.
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('quiz', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX quiz_quiz_categories_category_quiz_idx ON quiz_quiz_categories (category_id, quiz_id)',
+            'DROP INDEX quiz_quiz_categories_category_quiz_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX quiz_quiz_tags_tag_quiz_idx ON quiz_quiz_tags (tag_id, quiz_id)',
+            'DROP INDEX quiz_quiz_tags_tag_quiz_idx',
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.2 on 2026-10-17 18:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_first_attempts(apps, schema_editor):
+    """
+    Record the current attempt of every participant, and point the participant at it.
+    """
+    Participant = apps.get_model('quiz', 'Participant')
+    QuizAttempt = apps.get_model('quiz', 'QuizAttempt')
+    db_alias = schema_editor.connection.alias
+
+    participants = Participant.objects.using(db_alias).order_by('id').values_list(
+        'id', 'user_id', 'quiz_id', 'start_time', 'end_time', 'score')
+    for start in range(0, participants.count(), 500):
+        batch = list(participants[start:start + 500])
+        QuizAttempt.objects.using(db_alias).bulk_create([
+            QuizAttempt(user_id=user_id, quiz_id=quiz_id, started_at=start_time, end_time=end_time, score=score)
+            for _, user_id, quiz_id, start_time, end_time, score in batch
+        ])
+
+        # Every (user, quiz) pair has a single participant, so it identifies the new attempt.
+        attempts = {
+            (user_id, quiz_id): attempt_id
+            for attempt_id, user_id, quiz_id in QuizAttempt.objects.using(db_alias)
+            .filter(quiz_id__in={row[2] for row in batch}, user_id__in={row[1] for row in batch})
+            .values_list('id', 'user_id', 'quiz_id')
+        }
+        Participant.objects.using(db_alias).bulk_update([
+            Participant(id=participant_id, latest_attempt_id=attempts[(user_id, quiz_id)])
+            for participant_id, user_id, quiz_id, *_ in batch
+        ], ['latest_attempt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('quiz', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('end_time', models.DateTimeField()),
+                ('score', models.IntegerField(blank=True, null=True)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='quiz.quiz')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='quiz_attempts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='participant',
+            name='latest_attempt',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='quiz.quizattempt'),
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['user', 'quiz', 'started_at'], name='attempt_history_idx'),
+        ),
+        migrations.RunPython(create_first_attempts, migrations.RunPython.noop),
+    ]
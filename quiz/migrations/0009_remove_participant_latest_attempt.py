@@ -0,0 +1,17 @@
+# Generated by Django 4.2.2 on 2026-10-17 18:43
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0008_quiz_attempts'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='participant',
+            name='latest_attempt',
+        ),
+    ]
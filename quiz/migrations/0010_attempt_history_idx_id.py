@@ -0,0 +1,21 @@
+# Generated by Django 4.2.2 on 2026-10-17 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_remove_participant_latest_attempt'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='quizattempt',
+            name='attempt_history_idx',
+        ),
+        migrations.AddIndex(
+            model_name='quizattempt',
+            index=models.Index(fields=['user', 'quiz', 'started_at', 'id'], name='attempt_history_idx'),
+        ),
+    ]
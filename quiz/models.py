@@ -1,6 +1,7 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.db import models
+from django.db.models.functions import Lower
 from account.models import UserProfile
 
 
@@ -11,6 +12,13 @@ class Category(models.Model):
     """
 
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Names are unique regardless of case.
+            models.UniqueConstraint(Lower('name'), name='unique_category_name'),
+        ]
 
     def __str__(self):
         return self.name
@@ -23,11 +31,36 @@ class Tag(models.Model):
     """
 
     name = models.CharField(max_length=255)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Names are unique regardless of case.
+            models.UniqueConstraint(Lower('name'), name='unique_tag_name'),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class QuizQuerySet(models.QuerySet):
+
+    @staticmethod
+    def content_prefetches():
+        """
+        Prefetch plan for the nested quiz representation: tags, categories, questions and their answers
+        are fetched with one query each, whatever the number of quizzes.
+        """
+        return [
+            'tags',
+            'categories',
+            models.Prefetch('questions', queryset=Question.objects.prefetch_related('answers')),
+        ]
+
+    def with_content(self):
+        return self.prefetch_related(*self.content_prefetches())
+
+
 class Quiz(models.Model):
     """
     Represents a quiz containing multiple questions.
@@ -40,6 +73,11 @@ class Quiz(models.Model):
     created_by = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     categories = models.ManyToManyField(Category)
     tags = models.ManyToManyField(Tag)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Incremented whenever the questions, answers, categories or tags of the quiz change, see quiz.signals.
+    version = models.PositiveIntegerField(default=1)
+
+    objects = QuizQuerySet.as_manager()
 
     def __str__(self):
         return self.title
@@ -66,6 +104,7 @@ class Question(models.Model):
     text = models.TextField()
     type = models.CharField(max_length=2, choices=QuestionType.choices)
     points = models.IntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.text
@@ -80,6 +119,7 @@ class Answer(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="answers")
     text = models.CharField(max_length=255)
     is_correct = models.BooleanField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.text
@@ -93,14 +133,85 @@ class Participant(models.Model):
 
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
+    # Times of the first attempt, retakes only add a QuizAttempt. The score is the latest submitted one.
     start_time = models.DateTimeField()
     end_time = models.DateTimeField()
     score = models.IntegerField(null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'quiz'], name='unique_participant'),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.quiz.title}"
 
 
+class QuizAttempt(models.Model):
+    """
+    Represents one attempt of a user at a quiz. Attempts are only ever added, a retake never overwrites them.
+    Use Case: Keeping the history of retakes, and starting a quiz with a plain INSERT.
+    """
+
+    # Indexed by attempt_history_idx, which starts with the user.
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, db_index=False, related_name='quiz_attempts')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='attempts')
+    started_at = models.DateTimeField()
+    end_time = models.DateTimeField()
+    score = models.IntegerField(null=True, blank=True)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'quiz', 'started_at', 'id'], name='attempt_history_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.quiz.title} ({self.started_at})"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Represents the latest submitted score of a user for a quiz.
+    Use Case: Listing the top of a quiz's ranking from an index, without sorting all its participants.
+    """
+
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='leaderboard')
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    score = models.IntegerField()
+    submitted_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'user'], name='unique_leaderboard_entry'),
+        ]
+        indexes = [
+            models.Index(fields=['quiz', '-score', 'submitted_at'], name='leaderboard_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.quiz.title}: {self.score}"
+
+
+class ScoreBucket(models.Model):
+    """
+    Represents the number of leaderboard entries of a quiz having a given score.
+    Use Case: Answering "my rank" by summing a handful of buckets instead of counting every better participant.
+    """
+
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='score_buckets')
+    score = models.IntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['quiz', 'score'], name='unique_score_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.quiz.title}: {self.count} x {self.score}"
+
+
 class Feedback(models.Model):
     """
     Represents feedback provided by a participant for a quiz.
@@ -0,0 +1,139 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework import serializers
+
+from QuizAPI.cache import VersionedCache
+from .models import Question, Answer
+
+
+class AnswerKey:
+    """
+    Compact, read-only answer key of a single quiz.
+    Use Case: Validating and scoring a whole submission in memory instead of querying per answer.
+    """
+
+    __slots__ = ('quiz_id', 'questions', 'answer_question')
+
+    def __init__(self, quiz_id, questions, answer_question):
+        # questions: {question_id: (points, frozenset(correct_answer_ids))}
+        # answer_question: {answer_id: question_id}
+        self.quiz_id = quiz_id
+        self.questions = questions
+        self.answer_question = answer_question
+
+    def score(self, answers):
+        """
+        Validate the submitted answers against the key and return the total score.
+        Every question is scored at most once, whatever the number of times it is answered.
+        """
+        score = 0
+        scored_questions = set()
+        for answer_data in answers:
+            question_id = answer_data['question_id']
+            selected_answer = answer_data['selected_answer']
+
+            question = self.questions.get(question_id)
+            if question is None:
+                raise serializers.ValidationError("question is not belong to the given Quiz")
+
+            if self.answer_question.get(selected_answer) != question_id:
+                raise serializers.ValidationError(
+                    "Invalid selected answer / answer is not belong to the given question")
+
+            if question_id in scored_questions:
+                continue
+            scored_questions.add(question_id)
+
+            points, correct_answers = question
+            if selected_answer in correct_answers:
+                score += points
+
+        return score
+
+
+def load_answer_key(quiz_id):
+    """
+    Build the answer key of a quiz with two queries, independent of its number of questions.
+    """
+    questions = {
+        question_id: [points, set()]
+        for question_id, points in Question.objects.filter(quiz_id=quiz_id).values_list('id', 'points')
+    }
+
+    answer_question = {}
+    answers = Answer.objects.filter(question__quiz_id=quiz_id).values_list('id', 'question_id', 'is_correct')
+    for answer_id, question_id, is_correct in answers:
+        answer_question[answer_id] = question_id
+        if is_correct:
+            questions[question_id][1].add(answer_id)
+
+    questions = {
+        question_id: (points, frozenset(correct_answers))
+        for question_id, (points, correct_answers) in questions.items()
+    }
+    return AnswerKey(quiz_id, questions, answer_question)
+
+
+class AnswerKeyCache(VersionedCache):
+    """
+    Per-quiz answer key cache, see VersionedCache.
+    Use Case: Scoring submissions during an exam wave without touching the question tables.
+    """
+
+    prefix = 'quiz:answer-key'
+
+    def __init__(self, max_entries=512, local_timeout=5, cache_alias=None, timeout=None):
+        super().__init__(max_entries=max_entries, local_timeout=local_timeout, cache_alias=cache_alias,
+                         timeout=timeout)
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, 'QUIZ_ANSWER_KEY_CACHE', {})
+        return cls(
+            max_entries=options.get('MAX_ENTRIES', 512),
+            local_timeout=options.get('LOCAL_TIMEOUT', 5),
+            cache_alias=options.get('CACHE_ALIAS'),
+            timeout=options.get('TIMEOUT'),
+        )
+
+    def load(self, quiz_id):
+        answer_key = load_answer_key(quiz_id)
+        # Keys without questions are rebuilt every time, so unknown quiz ids cannot evict the keys of the quizzes
+        # being taken.
+        return answer_key if answer_key.questions else None
+
+    def get(self, quiz_id):
+        return super().get(quiz_id) or AnswerKey(quiz_id, {}, {})
+
+    async def aget(self, quiz_id):
+        return await super().aget(quiz_id) or AnswerKey(quiz_id, {}, {})
+
+
+_answer_keys = None
+
+
+def get_answer_key_cache():
+    global _answer_keys
+    if _answer_keys is None:
+        _answer_keys = AnswerKeyCache.from_settings()
+    return _answer_keys
+
+
+def get_answer_key(quiz_id):
+    return get_answer_key_cache().get(quiz_id)
+
+
+async def aget_answer_key(quiz_id):
+    return await get_answer_key_cache().aget(quiz_id)
+
+
+def invalidate_answer_key(quiz_id):
+    get_answer_key_cache().invalidate(quiz_id)
+
+
+@receiver(setting_changed)
+def reset_answer_key_cache(setting, **kwargs):
+    global _answer_keys
+    if setting == 'QUIZ_ANSWER_KEY_CACHE':
+        _answer_keys = None
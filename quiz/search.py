@@ -0,0 +1,174 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Quiz, Question
+
+# The index lives in raw tables outside of the ORM, created by migration 0005_search_index:
+# - SQLite: the FTS5 virtual table quiz_search_fts(title, description, questions), keyed by rowid = quiz id.
+# - PostgreSQL: quiz_search_document(quiz_id, document tsvector), with a GIN index on document.
+# Other databases have no index and fall back to icontains lookups.
+
+MAX_SEARCH_TERMS = 10
+INDEX_BATCH_SIZE = 500
+
+# Relative weight of the title, description and question matches in the ranking.
+SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+POSTGRES_CONFIG = 'english'
+
+
+def search_terms(text):
+    """
+    Split a search string into at most MAX_SEARCH_TERMS lowercase words. Operators and quotes are dropped,
+    so user input can never break the query syntax of the index.
+    """
+    return re.findall(r'\w+', text.lower())[:MAX_SEARCH_TERMS]
+
+
+def load_documents(quiz_ids):
+    """
+    Build the indexed text of the given quizzes with two queries: (quiz_id, title, description, questions).
+    """
+    questions = {}
+    question_texts = Question.objects.filter(quiz_id__in=quiz_ids).order_by('id').values_list('quiz_id', 'text')
+    for quiz_id, text in question_texts:
+        questions.setdefault(quiz_id, []).append(text)
+
+    return [
+        (quiz_id, title, description, '\n'.join(questions.get(quiz_id, [])))
+        for quiz_id, title, description in Quiz.objects.filter(id__in=quiz_ids).values_list(
+            'id', 'title', 'description')
+    ]
+
+
+def _batches(values):
+    values = list(values)
+    for start in range(0, len(values), INDEX_BATCH_SIZE):
+        yield values[start:start + INDEX_BATCH_SIZE]
+
+
+def remove_quizzes(quiz_ids):
+    if connection.vendor == 'sqlite':
+        table, column = 'quiz_search_fts', 'rowid'
+    elif connection.vendor == 'postgresql':
+        table, column = 'quiz_search_document', 'quiz_id'
+    else:
+        return
+
+    with connection.cursor() as cursor:
+        for batch in _batches(quiz_ids):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({placeholders})', batch)
+
+
+def write_documents(documents):
+    """
+    Insert or replace the index entries of already loaded documents, see load_documents.
+    """
+    if connection.vendor == 'sqlite':
+        # FTS5 tables have no upsert, the old rows are deleted first.
+        remove_quizzes([document[0] for document in documents])
+        sql = 'INSERT INTO quiz_search_fts (rowid, title, description, questions) VALUES (%s, %s, %s, %s)'
+    elif connection.vendor == 'postgresql':
+        sql = (
+            f"INSERT INTO quiz_search_document (quiz_id, document) VALUES (%s, "
+            f"setweight(to_tsvector('{POSTGRES_CONFIG}', %s), 'A') || "
+            f"setweight(to_tsvector('{POSTGRES_CONFIG}', %s), 'B') || "
+            f"setweight(to_tsvector('{POSTGRES_CONFIG}', %s), 'C')) "
+            f"ON CONFLICT (quiz_id) DO UPDATE SET document = EXCLUDED.document"
+        )
+    else:
+        return
+
+    with connection.cursor() as cursor:
+        for batch in _batches(documents):
+            cursor.executemany(sql, batch)
+
+
+def index_quizzes(quiz_ids):
+    """
+    Bring the index entries of the given quizzes up to date, dropping the ones of deleted quizzes.
+    """
+    quiz_ids = set(quiz_ids)
+    documents = []
+    for batch in _batches(quiz_ids):
+        documents += load_documents(batch)
+
+    remove_quizzes(quiz_ids - {document[0] for document in documents})
+    write_documents(documents)
+
+
+def rebuild_index():
+    quiz_ids = list(Quiz.objects.order_by('id').values_list('id', flat=True))
+    remove_quizzes(set(search_index_ids()) - set(quiz_ids))
+    for batch in _batches(quiz_ids):
+        write_documents(load_documents(batch))
+    return len(quiz_ids)
+
+
+def search_index_ids():
+    if connection.vendor == 'sqlite':
+        sql = 'SELECT rowid FROM quiz_search_fts'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT quiz_id FROM quiz_search_document'
+    else:
+        return []
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_quizzes(text, queryset=None, limit=20, offset=0):
+    """
+    Return the (quiz_id, rank) pairs of the quizzes matching every word of `text`, best matches first.
+    The last word also matches as a prefix. `queryset` restricts the results to the quizzes it selects, it
+    is applied inside the index query so filters do not change the cost of a page.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+
+    def restrict(column):
+        if queryset is None:
+            return '', []
+        subquery, subquery_params = queryset.values('id').query.sql_with_params()
+        return f'AND {column} IN ({subquery})', list(subquery_params)
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+        # The unary + keeps SQLite from handing the IN list to FTS5, which runs the MATCH once per listed id.
+        filter_sql, filter_params = restrict('+rowid')
+        sql = (
+            f"SELECT rowid, bm25(quiz_search_fts, {weights}) AS score FROM quiz_search_fts "
+            f"WHERE quiz_search_fts MATCH %s {filter_sql} "
+            f"ORDER BY score, rowid LIMIT %s OFFSET %s"
+        )
+        params = [match, *filter_params, limit, offset]
+        # bm25() is lower for better matches.
+        sign = -1
+    elif connection.vendor == 'postgresql':
+        query = ' & '.join(terms) + ':*'
+        filter_sql, filter_params = restrict('quiz_id')
+        sql = (
+            f"SELECT quiz_id, ts_rank(document, query) AS score "
+            f"FROM quiz_search_document, to_tsquery('{POSTGRES_CONFIG}', %s) query "
+            f"WHERE document @@ query {filter_sql} "
+            f"ORDER BY score DESC, quiz_id LIMIT %s OFFSET %s"
+        )
+        params = [query, *filter_params, limit, offset]
+        sign = 1
+    else:
+        condition = Q()
+        for term in terms:
+            condition &= (Q(title__icontains=term) | Q(description__icontains=term) |
+                          Q(questions__text__icontains=term))
+        quizzes = (queryset if queryset is not None else Quiz.objects.all()).filter(condition)
+        quiz_ids = quizzes.distinct().order_by('id').values_list('id', flat=True)[offset:offset + limit]
+        return [(quiz_id, None) for quiz_id in quiz_ids]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(quiz_id, round(sign * score, 6)) for quiz_id, score in cursor.fetchall()]
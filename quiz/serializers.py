@@ -1,31 +1,87 @@
 from rest_framework import serializers
-from .models import Category, Tag, Quiz, Question, Answer, Participant, Feedback
+from rest_framework.settings import api_settings
+from .models import Category, Tag, Quiz, QuizQuerySet, Question, Answer, Participant, QuizAttempt, Feedback
+from django.db import IntegrityError, transaction
+from django.db.models import Value, prefetch_related_objects
+from django.db.models.functions import Lower
 from django.utils import timezone
 
+from .attempts import latest_attempt, submit_attempt
+from .scoring import get_answer_key
+from .signals import quiz_content_changed
+
+BULK_CREATE_BATCH_SIZE = 500
+MAX_BULK_QUESTIONS = 5000
+
+
+def create_questions(quiz_id, questions_data):
+    """
+    Insert questions and their answers with batched INSERTs, in one transaction.
+    Use Case: Authoring large quizzes where the number of INSERTs should grow with batches, not rows.
+    """
+    questions = []
+    answers_data = []
+    for question_data in questions_data:
+        question_data = dict(question_data)
+        answers_data.append(question_data.pop('answers', None) or [])
+        questions.append(Question(quiz_id=quiz_id, **question_data))
+
+    with transaction.atomic():
+        Question.objects.bulk_create(questions, batch_size=BULK_CREATE_BATCH_SIZE)
+
+        answers = [
+            Answer(question=question, **answer_data)
+            for question, question_answers in zip(questions, answers_data)
+            for answer_data in question_answers
+        ]
+        Answer.objects.bulk_create(answers, batch_size=BULK_CREATE_BATCH_SIZE)
+
+    # bulk_create does not send post_save, so the quiz is flagged as changed here.
+    quiz_content_changed.send(sender=Question, quiz_id=quiz_id)
+
+    return questions
+
+
+class UniqueNameSerializer(serializers.ModelSerializer):
+    """
+    Base serializer of the models whose names are unique regardless of case.
+    The lookups go through Lower('name') so they use the functional unique index of the model, and the index
+    itself rejects the duplicates of concurrent requests.
+    """
+    unique_name_message = None
+
+    def validate_name(self, value):
+        model = self.Meta.model
+        queryset = model.objects.alias(lower_name=Lower('name')).filter(lower_name=Lower(Value(value)))
+        if self.instance is not None:
+            queryset = queryset.exclude(pk=self.instance.pk)
+        if queryset.exists():
+            raise serializers.ValidationError(self.unique_name_message)
+        return value
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError:
+            raise serializers.ValidationError({'name': [self.unique_name_message]})
+
+
+class CategorySerializer(UniqueNameSerializer):
+    unique_name_message = 'Category with this name is already exist'
 
-class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = ('id', 'name')
 
-    def validate_name(self, value):
-        exists_already = Category.objects.filter(name__iexact=value).exists()
-        if exists_already:
-            raise serializers.ValidationError('Category with this name is already exist')
-        return value
 
+class TagSerializer(UniqueNameSerializer):
+    unique_name_message = 'Tag with this name is already exist'
 
-class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ('id', 'name')
 
-    def validate_name(self, value):
-        exists_already = Tag.objects.filter(name__iexact=value).exists()
-        if exists_already:
-            raise serializers.ValidationError('Tag with this name is already exist')
-        return value
-
 
 class AnswerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -43,24 +99,36 @@ class AnswerSerializer(serializers.ModelSerializer):
         return answer
 
 
+class BulkQuestionListSerializer(serializers.ListSerializer):
+
+    def create(self, validated_data):
+        quiz_id = self.context['view'].kwargs['pk']
+        quiz = Quiz.objects.filter(pk=quiz_id).exists()
+        if not quiz:
+            raise serializers.ValidationError({'error': 'Invalid quiz ID'})
+
+        questions = create_questions(quiz_id, validated_data)
+        prefetch_related_objects(questions, 'answers')
+
+        return questions
+
+
 class QuestionSerializer(serializers.ModelSerializer):
     answers = AnswerSerializer(many=True, required=False)
 
     class Meta:
         model = Question
         fields = ('id', 'text', 'type', 'points', 'answers')
+        list_serializer_class = BulkQuestionListSerializer
 
     def create(self, validated_data):
-        answers_data = validated_data.pop('answers', None)
         quiz_id = self.context['view'].kwargs['pk']
         quiz = Quiz.objects.filter(pk=quiz_id).exists()
         if not quiz:
             raise serializers.ValidationError({'error': 'Invalid quiz ID'})
 
-        question = Question.objects.create(quiz_id=quiz_id, **validated_data)
-        if answers_data is not None:
-            for answer_data in answers_data:
-                Answer.objects.create(question=question, **answer_data)
+        question, = create_questions(quiz_id, [validated_data])
+        prefetch_related_objects([question], 'answers')
 
         return question
 
@@ -86,17 +154,15 @@ class QuizSerializer(serializers.ModelSerializer):
         tags = validated_data.pop('tags')
         categories = validated_data.pop('categories')
 
-        quiz = Quiz.objects.create(**validated_data)
-        quiz.tags.set(tags)
-        quiz.categories.set(categories)
+        with transaction.atomic():
+            quiz = Quiz.objects.create(**validated_data)
+            quiz.tags.set(tags)
+            quiz.categories.set(categories)
 
-        if questions_data is not None:
-            for question_data in questions_data:
-                answers_data = question_data.pop('answers')
-                question = Question.objects.create(quiz=quiz, **question_data)
+            if questions_data is not None:
+                create_questions(quiz.id, questions_data)
 
-                for answer_data in answers_data:
-                    Answer.objects.create(question=question, **answer_data)
+        prefetch_related_objects([quiz], *QuizQuerySet.content_prefetches())
 
         return quiz
 
@@ -116,68 +182,65 @@ class QuizSerializer(serializers.ModelSerializer):
         return instance
 
 
+class QuizSearchResultSerializer(serializers.ModelSerializer):
+    rank = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Quiz
+        fields = ('id', 'title', 'description', 'time_limit', 'tags', 'categories', 'created_by', 'rank')
+
+    def get_rank(self, obj):
+        return self.context['ranks'].get(obj.id)
+
+
 class SubmitAnswerSerializer(serializers.Serializer):
     question_id = serializers.IntegerField()
     selected_answer = serializers.IntegerField()
 
-    def validate(self, data):
-        question_id = data.get('question_id')
-        selected_answer = data.get('selected_answer')
 
-        try:
-            question = Question.objects.get(id=question_id)
-            Answer.objects.get(id=selected_answer, question=question)
-        except Question.DoesNotExist:
-            raise serializers.ValidationError("Invalid question ID")
-        except Answer.DoesNotExist:
-            raise serializers.ValidationError("Invalid selected answer / answer is not belong to the given question")
+TIME_OVER_ERROR = "Participant's time is over. Submission not allowed."
 
-        return data
+
+def participant_error(user, quiz_id):
+    """
+    Explain why a user cannot submit to a quiz, or return None if they can.
+    Only called once a submission failed, the accepted ones are checked by the UPDATE that records them.
+    """
+    end_time = latest_attempt(user, quiz_id).values_list('end_time', flat=True).first()
+    if end_time is None:
+        return "Invalid quiz ID" if not Quiz.objects.filter(id=quiz_id).exists() else "Participant not found"
+    if end_time < timezone.now():
+        return TIME_OVER_ERROR
+    return None
 
 
-class SubmitQuizSerializer(serializers.Serializer):
+class SubmissionSerializer(serializers.Serializer):
+    """
+    Shape of a quiz submission, validated without touching the database.
+    """
     quiz_id = serializers.IntegerField()
     answers = SubmitAnswerSerializer(many=True)
     score = serializers.IntegerField(read_only=True)
 
-    def calculate_score(self, quiz, answers):
-        score = 0
-        for answer_data in answers:
-            serializer = SubmitAnswerSerializer(data=answer_data)
-            serializer.is_valid(raise_exception=True)
 
-            question_id = serializer.validated_data['question_id']
-            selected_answer = serializer.validated_data['selected_answer']
-            try:
-                question = Question.objects.get(id=question_id, quiz=quiz)
-            except Question.DoesNotExist:
-                raise serializers.ValidationError("question is not belong to the given Quiz")
+class SubmitQuizSerializer(SubmissionSerializer):
 
-            correct_answers = Answer.objects.filter(question=question, is_correct=True)
-            if correct_answers.filter(id=selected_answer).exists():
-                score += question.points
-
-        return score
+    def calculate_score(self, quiz_id, answers):
+        answer_key = get_answer_key(quiz_id)
+        return answer_key.score(answers)
 
     def validate(self, data):
         quiz_id = data.get('quiz_id')
         answers = data.get('answers')
 
         try:
-            quiz = Quiz.objects.get(id=quiz_id)
-            participant = Participant.objects.get(user=self.context['request'].user, quiz=quiz)
-
-            current_time = timezone.now()
-            if current_time > participant.end_time:
-                raise serializers.ValidationError("Participant's time is over. Submission not allowed.")
-
-        except Quiz.DoesNotExist:
-            raise serializers.ValidationError("Invalid quiz ID")
-        except Participant.DoesNotExist:
-            raise serializers.ValidationError("Participant not found")
-
-        score = self.calculate_score(quiz, answers)
-        data['score'] = score
+            data['score'] = self.calculate_score(quiz_id, answers)
+        except serializers.ValidationError:
+            # Errors of the participant come first, e.g. answers to an unknown quiz make it an invalid quiz ID.
+            error = participant_error(self.context['request'].user, quiz_id)
+            if error is not None:
+                raise serializers.ValidationError(error)
+            raise
 
         return data
 
@@ -185,11 +248,16 @@ class SubmitQuizSerializer(serializers.Serializer):
         user = self.context['request'].user
         quiz_id = self.validated_data['quiz_id']
         score = self.validated_data['score']
-        quiz = Quiz.objects.get(id=quiz_id)
 
-        participant = Participant.objects.get(user=user, quiz=quiz)
-        participant.score = score
-        participant.save()
+        if not submit_attempt(user, quiz_id, score):
+            error = participant_error(user, quiz_id) or TIME_OVER_ERROR
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [error]})
+
+
+class QuizAttemptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = QuizAttempt
+        fields = ('id', 'started_at', 'end_time', 'score', 'submitted_at')
 
 
 class FeedbackSerializer(serializers.ModelSerializer):
@@ -0,0 +1,193 @@
+import threading
+import weakref
+
+from django.db import transaction
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from QuizAPI.response_cache import get_response_cache, invalidate_responses
+from .caching import CATEGORIES, TAGS, QUIZZES, QUIZ_LINKS, quiz_namespace
+from .leaderboard import forget_score
+from .models import Category, Tag, Quiz, Question, Answer, LeaderboardEntry
+from .scoring import invalidate_answer_key
+from .delivery import invalidate_delivery_payload
+from .search import index_quizzes
+
+# Sent with a `quiz_id` argument whenever the questions or answers of a quiz change.
+# Bulk write paths, which bypass the model signals, send it themselves.
+quiz_content_changed = Signal()
+
+
+def deleted_with(origin, *models):
+    # `origin` is the instance or queryset whose deletion cascaded to the row, None when the row was saved.
+    if origin is None:
+        return False
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, models)
+
+
+@receiver([post_save, post_delete], sender=Question)
+def question_changed(sender, instance, origin=None, **kwargs):
+    # Deleting the quiz drops its caches once, see quiz_deleted.
+    if not deleted_with(origin, Quiz):
+        quiz_content_changed.send(sender=sender, quiz_id=instance.quiz_id)
+
+
+@receiver([post_save, post_delete], sender=Answer)
+def answer_changed(sender, instance, origin=None, **kwargs):
+    # The deletion of the question or quiz is signalled on its own.
+    if deleted_with(origin, Quiz, Question):
+        return
+
+    if Answer.question.is_cached(instance):
+        quiz_id = instance.question.quiz_id
+    else:
+        quiz_id = Question.objects.filter(pk=instance.question_id).values_list('quiz_id', flat=True).first()
+
+    if quiz_id is not None:
+        quiz_content_changed.send(sender=sender, quiz_id=quiz_id)
+
+
+def touch_quizzes(quizzes):
+    # Conditional GETs of a quiz compare its version and updated_at, see quiz.conditional.
+    quizzes.update(version=F('version') + 1, updated_at=timezone.now())
+
+
+def linked_quizzes(link):
+    field = 'categories' if isinstance(link, Category) else 'tags'
+    return Quiz.objects.filter(**{field: link}).values_list('id', flat=True)
+
+
+def drop_caches(quiz_ids, namespaces=()):
+    for quiz_id in quiz_ids:
+        invalidate_answer_key(quiz_id)
+        invalidate_delivery_payload(quiz_id)
+    namespaces = {quiz_namespace(quiz_id) for quiz_id in quiz_ids} | set(namespaces)
+    if quiz_ids:
+        namespaces.add(QUIZZES)
+    if namespaces:
+        get_response_cache().invalidate(*namespaces)
+
+
+class QuizChanges:
+    """
+    Quizzes written in the current transaction, handled once per quiz when it commits.
+    Use Case: Dropping the caches of a quiz, touching and reindexing it once when a request writes many of its
+    questions, answers and links.
+    """
+
+    def __init__(self):
+        self.changed = set()
+        self.touched = set()
+        self.reindexed = set()
+        self.namespaces = set()
+        self.flushed = False
+
+    def add(self, quiz_ids, touch, reindex, namespaces):
+        self.changed |= quiz_ids
+        self.namespaces.update(namespaces)
+        if touch:
+            self.touched |= quiz_ids
+        if reindex:
+            self.reindexed |= quiz_ids
+
+    def flush(self):
+        self.flushed = True
+        # A request running before the commit may have cached the old content again.
+        drop_caches(self.changed, self.namespaces)
+        if self.touched:
+            touch_quizzes(Quiz.objects.filter(pk__in=self.touched))
+        if self.reindexed:
+            # Also drops the entries of the deleted quizzes.
+            index_quizzes(self.reindexed)
+
+
+_pending = threading.local()
+
+
+def quizzes_changed(quiz_ids, touch=False, reindex=False, namespaces=()):
+    """
+    Record a write to quizzes: their caches are dropped now and again when the current transaction commits, when
+    they are also touched and reindexed if asked. Outside of a transaction everything happens right away.
+    """
+    quiz_ids = set(quiz_ids)
+    if not transaction.get_connection().in_atomic_block:
+        changes = QuizChanges()
+        changes.add(quiz_ids, touch, reindex, namespaces)
+        changes.flush()
+        return
+
+    # Also dropped right away, for the reads of the writing transaction itself.
+    drop_caches(quiz_ids, namespaces)
+
+    # The on_commit callback holds the only strong reference to the changes, so they are gone once the
+    # transaction or savepoint that registered them rolls back.
+    ref = getattr(_pending, 'changes', None)
+    changes = ref() if ref is not None else None
+    if changes is None or changes.flushed:
+        changes = QuizChanges()
+        _pending.changes = weakref.ref(changes)
+        transaction.on_commit(changes.flush)
+    changes.add(quiz_ids, touch, reindex, namespaces)
+
+
+@receiver(quiz_content_changed)
+def quiz_content_written(sender, quiz_id, **kwargs):
+    # Answers are not part of the search index.
+    quizzes_changed([quiz_id], touch=True, reindex=sender is Question)
+
+
+@receiver([post_save, post_delete], sender=Quiz)
+def quiz_written(sender, instance, **kwargs):
+    quizzes_changed([instance.pk], reindex=True)
+
+
+@receiver(m2m_changed, sender=Quiz.categories.through)
+@receiver(m2m_changed, sender=Quiz.tags.through)
+def quiz_links_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # The quizzes losing the category or tag are only known before the clear.
+        quizzes_changed(linked_quizzes(instance), touch=True)
+    if not action.startswith('post_'):
+        return
+    if reverse:
+        # Changed from the category or tag side, any cached quiz may be affected.
+        quizzes_changed(pk_set or (), touch=True, namespaces=[QUIZ_LINKS])
+    else:
+        quizzes_changed([instance.pk], touch=True)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, **kwargs):
+    invalidate_responses(CATEGORIES)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Tag)
+def link_deleting(sender, instance, **kwargs):
+    # The links of a deleted category or tag are removed without an m2m_changed signal.
+    quizzes_changed(linked_quizzes(instance), touch=True)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    invalidate_responses(CATEGORIES, QUIZ_LINKS)
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, **kwargs):
+    invalidate_responses(TAGS)
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    invalidate_responses(TAGS, QUIZ_LINKS)
+
+
+@receiver(post_delete, sender=LeaderboardEntry)
+def leaderboard_entry_deleted(sender, instance, origin=None, **kwargs):
+    # With the user, so the ranks of the others move up. The buckets of a deleted quiz are deleted with it.
+    if not deleted_with(origin, Quiz):
+        forget_score(instance.quiz_id, instance.score)
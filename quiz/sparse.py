@@ -0,0 +1,125 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
+
+
+def parse_list(value):
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+def serializer_fields(serializer):
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    return serializer.fields
+
+
+def prune_fields(serializer, fields=None, expand=None, prefix=''):
+    """
+    Drop the fields of a serializer that were not asked for, in place.
+    `fields` holds dotted field names (`id`, `questions.text`); a level without any requested name keeps all
+    its fields. `expand` holds the dotted paths of the nested serializers to embed (`questions`,
+    `questions.answers`); when it is None every nested serializer is embedded.
+    """
+    available = serializer_fields(serializer)
+
+    requested = None
+    if fields is not None:
+        requested = {name[len(prefix):].split('.')[0] for name in fields if name.startswith(prefix)}
+        unknown = requested - set(available)
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': f"Unknown field(s): {', '.join(sorted(prefix + name for name in unknown))}"})
+
+    for name, field in list(available.items()):
+        path = prefix + name
+        nested = isinstance(field, serializers.BaseSerializer)
+        if (requested and name not in requested) or (nested and expand is not None and path not in expand):
+            available.pop(name)
+        elif nested:
+            prune_fields(field, fields, expand, path + '.')
+
+
+def expand_paths(serializer, value, prefix=''):
+    """
+    Parse the `expand` parameter into the set of nested paths, the parents of every path included.
+    """
+    paths = set()
+    for path in parse_list(value):
+        parts = path.split('.')
+        paths.update('.'.join(parts[:index]) for index in range(1, len(parts) + 1))
+
+    def nested_paths(serializer, prefix):
+        for name, field in serializer_fields(serializer).items():
+            if isinstance(field, serializers.BaseSerializer):
+                yield prefix + name
+                yield from nested_paths(field, prefix + name + '.')
+
+    unknown = paths - set(nested_paths(serializer, prefix))
+    if unknown:
+        raise serializers.ValidationError({'expand': f"Unknown relation(s): {', '.join(sorted(unknown))}"})
+    return paths
+
+
+def optimize_queryset(queryset, serializer, extra_fields=()):
+    """
+    Restrict a queryset to what the (pruned) serializer reads: only() its concrete fields, and prefetch its
+    nested serializers and related id lists with querysets optimized the same way.
+    """
+    model = queryset.model
+    only = set(extra_fields)
+    prefetches = []
+    for field in serializer_fields(serializer).values():
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            related = model_field.related_model.objects.all()
+            # The prefetch matches the rows to their parent through the foreign key.
+            back_reference = [model_field.field.name] if model_field.one_to_many else []
+            prefetches.append(Prefetch(field.source, queryset=optimize_queryset(related, field, back_reference)))
+        elif isinstance(field, ManyRelatedField):
+            prefetches.append(Prefetch(field.source, queryset=model_field.related_model.objects.only('pk')))
+        elif model_field.concrete:
+            only.add(field.source)
+
+    return queryset.only(*only).prefetch_related(*prefetches)
+
+
+class SparseFieldsMixin:
+    """
+    Generic view mixin answering GET requests with the fields asked for by `?fields=` and `?expand=`, and
+    fetching only those.
+    Use Case: Catalog pages that need quiz titles without paying for every question and answer.
+    """
+
+    def sparse_params(self):
+        if self.request.method != 'GET':
+            return None
+        params = self.request.query_params
+        if 'fields' not in params and 'expand' not in params:
+            return None
+        if not hasattr(self, '_sparse_params'):
+            serializer = self.get_serializer_class()(context=self.get_serializer_context())
+            fields = parse_list(params['fields']) if 'fields' in params else None
+            expand = expand_paths(serializer, params['expand']) if 'expand' in params else None
+            self._sparse_params = fields, expand
+        return self._sparse_params
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        sparse = self.sparse_params()
+        if sparse is not None:
+            prune_fields(serializer, *sparse)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        # Applied here rather than in get_queryset(), so views overriding get_queryset() are optimized too.
+        queryset = super().filter_queryset(queryset)
+        if self.sparse_params() is None:
+            return queryset
+
+        # The prefetches of the view are replaced by the ones the requested fields need.
+        return optimize_queryset(queryset.prefetch_related(None), self.get_serializer())
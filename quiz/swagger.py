@@ -1,6 +1,8 @@
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 
+from .serializers import QuestionSerializer
+
 
 def category_list_swagger_schema():
     return swagger_auto_schema(
@@ -68,9 +70,60 @@ def tag_delete_swagger_schema():
     )
 
 
+def quiz_filter_parameters():
+    return [
+        openapi.Parameter(
+            name='categories',
+            in_=openapi.IN_QUERY,
+            description='Comma separated category IDs',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            name='tags',
+            in_=openapi.IN_QUERY,
+            description='Comma separated tag IDs',
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            name='match',
+            in_=openapi.IN_QUERY,
+            description="'any' (default): quizzes having one of the categories and one of the tags, "
+                        "'all': quizzes having all of them",
+            type=openapi.TYPE_STRING,
+            enum=['any', 'all']
+        ),
+    ]
+
+
+def sparse_fields_parameters(expand_example):
+    return [
+        openapi.Parameter(
+            name='fields',
+            in_=openapi.IN_QUERY,
+            description="Comma separated fields to return, nested ones as dotted paths (e.g. 'id,title')",
+            type=openapi.TYPE_STRING
+        ),
+        openapi.Parameter(
+            name='expand',
+            in_=openapi.IN_QUERY,
+            description=f"Comma separated nested relations to embed (e.g. '{expand_example}'); "
+                        "all of them when omitted",
+            type=openapi.TYPE_STRING
+        ),
+    ]
+
+
 def quiz_list_swagger_schema():
     return swagger_auto_schema(
-        operation_description="Get list of all quizzes",
+        operation_description="Get list of all quizzes, optionally filtered by categories and tags",
+        manual_parameters=quiz_filter_parameters() + sparse_fields_parameters('questions.answers') + [
+            openapi.Parameter(
+                name='facets',
+                in_=openapi.IN_QUERY,
+                description="'true' to add the number of matching quizzes per category and per tag",
+                type=openapi.TYPE_STRING
+            ),
+        ],
     )
 
 
@@ -83,6 +136,7 @@ def quiz_create_swagger_schema():
 def quiz_retrieve_swagger_schema():
     return swagger_auto_schema(
         operation_description="Retrieve a quiz",
+        manual_parameters=sparse_fields_parameters('questions.answers'),
     )
 
 
@@ -101,6 +155,40 @@ def quiz_delete_swagger_schema():
     )
 
 
+def quiz_delivery_swagger_schema():
+    return swagger_auto_schema(
+        operation_description="Get the questions and answers of a quiz for taking it, without the correct answers. "
+                              "The payload is rendered once per change of the quiz and sent gzip compressed when "
+                              "the client accepts it.",
+        responses={
+            200: openapi.Response(
+                description='Quiz content',
+                examples={
+                    'application/json': {
+                        'id': 1,
+                        'title': 'Python basics',
+                        'description': 'Description',
+                        'time_limit': 30,
+                        'questions': [
+                            {'id': 1, 'text': 'Question', 'type': 'MC', 'points': 1,
+                             'answers': [{'id': 1, 'text': 'Answer'}]},
+                        ],
+                    },
+                },
+            ),
+            304: "Not Modified",
+            404: openapi.Response(
+                description='Invalid quiz ID',
+                examples={
+                    'application/json': {
+                        'error': 'Invalid quiz ID',
+                    },
+                },
+            ),
+        }
+    )
+
+
 def start_quiz_swagger_schema():
     return swagger_auto_schema(
         operation_description="Start a quiz",
@@ -179,6 +267,92 @@ def submit_quiz_swagger_schema():
     )
 
 
+def quiz_search_swagger_schema():
+    return swagger_auto_schema(
+        operation_description="Search quizzes by title, description and question text, best matches first",
+        manual_parameters=[
+            openapi.Parameter(
+                name='q',
+                in_=openapi.IN_QUERY,
+                description='Words to search for, the last one also matches as a prefix',
+                type=openapi.TYPE_STRING,
+                required=True
+            ),
+            *quiz_filter_parameters(),
+            openapi.Parameter(
+                name='limit',
+                in_=openapi.IN_QUERY,
+                description='Number of results to return (20 by default, 100 at most)',
+                type=openapi.TYPE_INTEGER
+            ),
+            openapi.Parameter(
+                name='offset',
+                in_=openapi.IN_QUERY,
+                description='Number of results to skip',
+                type=openapi.TYPE_INTEGER
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description='Matching quizzes',
+                examples={
+                    'application/json': {
+                        'q': 'python basics',
+                        'results': [
+                            {'id': 3, 'title': 'Python basics', 'description': 'Variables and loops',
+                             'time_limit': 20, 'tags': [1], 'categories': [2], 'created_by': 1, 'rank': 4.52},
+                        ],
+                        'next_offset': None,
+                    },
+                },
+            ),
+        }
+    )
+
+
+def attempt_list_swagger_schema():
+    return swagger_auto_schema(
+        operation_description="Get the attempts of the current user at a quiz, newest first",
+        manual_parameters=[
+            openapi.Parameter(
+                name='id',
+                in_=openapi.IN_PATH,
+                description='ID of the Quiz',
+                type=openapi.TYPE_INTEGER
+            ),
+        ]
+    )
+
+
+def leaderboard_swagger_schema():
+    return swagger_auto_schema(
+        operation_description="Get the top scores of a quiz, and the rank of the current user",
+        manual_parameters=[
+            openapi.Parameter(
+                name='limit',
+                in_=openapi.IN_QUERY,
+                description='Number of entries to return (10 by default, 100 at most)',
+                type=openapi.TYPE_INTEGER
+            ),
+        ],
+        responses={
+            200: openapi.Response(
+                description='Leaderboard of the quiz',
+                examples={
+                    'application/json': {
+                        'quiz_id': 1,
+                        'results': [
+                            {'rank': 1, 'user_id': 4, 'username': 'alice', 'score': 18},
+                            {'rank': 2, 'user_id': 7, 'username': 'bob', 'score': 12},
+                        ],
+                        'me': {'rank': 2, 'score': 12},
+                    },
+                },
+            ),
+        }
+    )
+
+
 def question_list_swagger_schema():
     return swagger_auto_schema(
         operation_description="Get a list of questions",
@@ -189,7 +363,7 @@ def question_list_swagger_schema():
                 description='ID of the Quiz to list all questions',
                 type=openapi.TYPE_INTEGER
             ),
-        ]
+        ] + sparse_fields_parameters('answers')
     )
 
 
@@ -207,9 +381,28 @@ def question_create_swagger_schema():
     )
 
 
+def question_bulk_create_swagger_schema():
+    return swagger_auto_schema(
+        operation_description="Create many questions, with their answers, in one request",
+        request_body=QuestionSerializer(many=True),
+        responses={
+            201: QuestionSerializer(many=True),
+        },
+        manual_parameters=[
+            openapi.Parameter(
+                name='id',
+                in_=openapi.IN_PATH,
+                description='ID of the Quiz , where the questions should be added',
+                type=openapi.TYPE_INTEGER
+            ),
+        ]
+    )
+
+
 def question_retrieve_swagger_schema():
     return swagger_auto_schema(
         operation_description="Retrieve a question",
+        manual_parameters=sparse_fields_parameters('answers'),
     )
 
 
@@ -324,3 +517,24 @@ def feedback_delete_swagger_schema():
             204: "No Content",
         }
     )
+
+
+def response_cache_stats_swagger_schema():
+    return swagger_auto_schema(
+        operation_description="Get the hit and miss counters of the response cache of this worker (staff only)",
+        responses={
+            200: openapi.Response(
+                description='Response cache counters',
+                examples={
+                    'application/json': {
+                        'hits': 120,
+                        'misses': 8,
+                        'namespaces': {
+                            'categories': {'hits': 100, 'misses': 2},
+                            'quiz': {'hits': 20, 'misses': 6},
+                        },
+                    },
+                },
+            ),
+        }
+    )
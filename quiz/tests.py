@@ -1,13 +1,45 @@
 from django.urls import reverse
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.test import APITestCase
-from .models import Category, Tag, Quiz, Question, Answer, Participant, Feedback
+from .models import (
+    Category, Tag, Quiz, Question, Answer, Participant, QuizAttempt, Feedback, ScoreBucket,
+    LeaderboardEntry
+)
 from .serializers import (
     CategorySerializer, TagSerializer, QuizSerializer
 )
 from account.models import UserProfile
+from asgiref.sync import sync_to_async
+from rest_framework.authtoken.models import Token
+from account.authentication import get_token_user_cache
+import gzip
+import json
+from io import BytesIO, StringIO
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.db.models import Value
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from datetime import timedelta
+from QuizAPI.cache import LocalLRUCache
+from .attempts import latest_attempt, start_attempt
+from .leaderboard import rank_of
+from .scoring import get_answer_key_cache
+from .delivery import get_delivery_cache, invalidate_delivery_payload
+from django.core.cache import caches
+from QuizAPI.response_cache import get_response_cache
+from QuizAPI.renderers import FastJSONRenderer
+from QuizAPI.parsers import FastJSONParser
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from decimal import Decimal
+from unittest import mock
+import time
+import uuid
+from importlib import import_module
+from django.apps import apps
 
 
 class CategoryListCreateViewTest(APITestCase):
@@ -23,6 +55,15 @@ class CategoryListCreateViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(Category.objects.get().name, 'Test Category')
 
+    def test_create_duplicate_category(self):
+        Category.objects.create(name='Test Category')
+        url = reverse('quiz:category-list-create')
+        response = self.client.post(url, {'name': 'TEST category'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['name'], ['Category with this name is already exist'])
+        self.assertEqual(Category.objects.count(), 1)
+
     def test_list_categories(self):
         url = reverse('quiz:category-list-create')
         Category.objects.create(name='Category 1')
@@ -110,12 +151,52 @@ class TagRetrieveUpdateDeleteViewTest(APITestCase):
         self.tag.refresh_from_db()
         self.assertEqual(self.tag.name, new_name)
 
+    def test_update_tag_case(self):
+        response = self.client.put(self.url, {'name': 'TEST TAG'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.name, 'TEST TAG')
+
+    def test_update_tag_to_existing_name(self):
+        Tag.objects.create(name='Other tag')
+        response = self.client.put(self.url, {'name': 'other TAG'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.tag.refresh_from_db()
+        self.assertEqual(self.tag.name, 'Test tag')
+
     def test_delete_tag(self):
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Tag.objects.filter(id=self.tag.id).exists())
 
 
+class UniqueNameTest(TestCase):
+    def test_constraint_is_case_insensitive(self):
+        Tag.objects.create(name='Python')
+        with self.assertRaises(IntegrityError):
+            Tag.objects.create(name='PYTHON')
+
+    def test_concurrent_duplicate_is_rejected(self):
+        serializer = CategorySerializer(data={'name': 'Science'})
+        self.assertTrue(serializer.is_valid())
+
+        # Another request creates the same name between the validation and the INSERT.
+        Category.objects.create(name='science')
+
+        with self.assertRaisesMessage(ValidationError, 'Category with this name is already exist'):
+            serializer.save()
+        self.assertEqual(Category.objects.count(), 1)
+
+    def test_seeding_commands_skip_existing_names(self):
+        for _ in range(2):
+            call_command('create_tags', 20, stdout=StringIO())
+            call_command('create_categories', 20, stdout=StringIO())
+
+        for model in (Tag, Category):
+            names = [name.lower() for name in model.objects.values_list('name', flat=True)]
+            self.assertEqual(len(set(names)), len(names))
+
+
 class QuizListCreateViewTest(APITestCase):
     def setUp(self):
         self.url = reverse('quiz:quiz-list-create')
@@ -175,16 +256,84 @@ class QuizListCreateViewTest(APITestCase):
 
         self.assertEqual(quiz.created_by, self.user)
 
+    def test_create_quiz_batches_inserts(self):
+        data = {
+            "title": "Test Quiz",
+            "description": "Test Description",
+            "time_limit": 30,
+            "tags": [self.tag.id],
+            "categories": [self.category.id],
+            "questions": [
+                {
+                    "text": f"Question {i}",
+                    "type": "MC",
+                    "points": 1,
+                    "answers": [
+                        {"text": "Right", "is_correct": True},
+                        {"text": "Wrong", "is_correct": False},
+                    ]
+                }
+                for i in range(100)
+            ]
+        }
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # quiz, tags, categories, questions and answers
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 5)
+
+        self.assertEqual(len(response.data['questions']), 100)
+        self.assertEqual(len(response.data['questions'][0]['answers']), 2)
+
     def test_list_quizzes(self):
         Quiz.objects.create(title='Quiz 1', created_by=self.user, time_limit=30)
         Quiz.objects.create(title='Quiz 2', created_by=self.user, time_limit=45)
 
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
         serializer_data = QuizSerializer(Quiz.objects.all(), many=True).data
-        self.assertEqual(response.data, serializer_data)
+        self.assertEqual(response.data['results'], serializer_data)
+
+    def test_list_quizzes_query_count_is_constant(self):
+        for i in range(10):
+            quiz = Quiz.objects.create(title=f'Quiz {i}', created_by=self.user, time_limit=30)
+            quiz.tags.add(self.tag)
+            quiz.categories.add(self.category)
+            for j in range(3):
+                question = Question.objects.create(quiz=quiz, text=f'Question {j}', type='MC', points=1)
+                Answer.objects.create(question=question, text='Right', is_correct=True)
+                Answer.objects.create(question=question, text='Wrong', is_correct=False)
+
+        # quizzes, tags, categories, questions and answers, the ETag comes from the response cache
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        serializer_data = QuizSerializer(Quiz.objects.all(), many=True).data
+        self.assertEqual(response.data['results'], serializer_data)
+
+    def test_list_quizzes_cursor_pagination(self):
+        for i in range(25):
+            Quiz.objects.create(title=f'Quiz {i}', created_by=self.user, time_limit=30)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([quiz['title'] for quiz in response.data['results']],
+                         [f'Quiz {i}' for i in range(20, 25)])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(len(response.data['results']), 25)
 
 
 class QuizRetrieveUpdateDeleteViewTest(APITestCase):
@@ -254,6 +403,17 @@ class QuizRetrieveUpdateDeleteViewTest(APITestCase):
         answers_data = question_data['answers']
         self.assertEqual(len(answers_data), 3)
 
+    def test_retrieve_quiz_query_count(self):
+        for i in range(10):
+            question = Question.objects.create(quiz=self.quiz, text=f'Question {i}', type='MC', points=1)
+            Answer.objects.create(question=question, text='Right', is_correct=True)
+
+        # ETag state, quiz, tags, categories, questions and answers
+        with self.assertNumQueries(6):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['questions']), 11)
+
     def test_update_quiz(self):
         updated_data = {
             'title': 'Updated Quiz',
@@ -284,6 +444,18 @@ class QuizRetrieveUpdateDeleteViewTest(APITestCase):
         self.assertFalse(Answer.objects.filter(pk=self.answer2.pk).exists())
         self.assertFalse(Answer.objects.filter(pk=self.answer3.pk).exists())
 
+    def test_delete_quiz_query_count_is_constant(self):
+        for i in range(20):
+            question = Question.objects.create(quiz=self.quiz, text=f'Question {i}', type='MC', points=1)
+            Answer.objects.bulk_create([Answer(question=question, text=f'Answer {j}', is_correct=j == 0) for j in range(4)])
+
+        # Loading the quiz for its representation (7), collecting its rows (2) and deleting them (8). Its search
+        # document is dropped when the transaction commits, and the questions and answers do not touch or reindex
+        # the quiz one by one.
+        with self.assertNumQueries(17):
+            response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
 
 class StartQuizViewTest(APITestCase):
     def setUp(self):
@@ -310,6 +482,239 @@ class StartQuizViewTest(APITestCase):
         response = self.client.post(self.url, data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_start_quiz_invalid_quiz_id_type(self):
+        data = {'quiz_id': 'abc'}
+
+        response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_restart_quiz(self):
+        data = {'quiz_id': self.quiz.id}
+        self.client.post(self.url, data)
+        Participant.objects.filter(user=self.user, quiz=self.quiz).update(score=10)
+        first = Participant.objects.get(user=self.user, quiz=self.quiz)
+
+        # reading the time limit, then the attempt INSERT and the participant INSERT, ignored, in a savepoint
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        participant = Participant.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((participant.start_time, participant.end_time, participant.score),
+                         (first.start_time, first.end_time, 10))
+        self.assertIsNone(QuizAttempt.objects.latest('started_at').score)
+
+    def test_restart_keeps_attempt_history(self):
+        data = {'quiz_id': self.quiz.id}
+        self.client.post(self.url, data)
+        first = QuizAttempt.objects.get()
+        QuizAttempt.objects.filter(pk=first.pk).update(score=10)
+
+        self.client.post(self.url, data)
+        self.assertEqual(QuizAttempt.objects.count(), 2)
+        first.refresh_from_db()
+        self.assertEqual(first.score, 10)
+
+        latest = QuizAttempt.objects.latest('started_at')
+        self.assertEqual(latest_attempt(self.user, self.quiz.id).get(), latest)
+        participant = Participant.objects.get(user=self.user, quiz=self.quiz)
+        self.assertEqual((participant.start_time, participant.end_time), (first.started_at, first.end_time))
+
+    def test_participant_is_unique(self):
+        Participant.objects.create(user=self.user, quiz=self.quiz, start_time=timezone.now(), end_time=timezone.now())
+
+        with self.assertRaises(IntegrityError):
+            Participant.objects.create(user=self.user, quiz=self.quiz, start_time=timezone.now(),
+                                       end_time=timezone.now())
+
+
+class AsyncExamViewTest(TestCase):
+    def setUp(self):
+        self.start_url = reverse('quiz:async-start-quiz')
+        self.submit_url = reverse('quiz:async-submit-quiz')
+        self.user = UserProfile.objects.create(username='taker')
+        self.token = Token.objects.get(user=self.user)
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+        self.quiz = Quiz.objects.create(title='Test Quiz', description='Test Description', time_limit=30,
+                                        created_by=self.user)
+        self.question = Question.objects.create(quiz=self.quiz, text='Test question', type='MC', points=3)
+        self.right = Answer.objects.create(question=self.question, text='Right', is_correct=True)
+        self.wrong = Answer.objects.create(question=self.question, text='Wrong', is_correct=False)
+
+    async def post(self, url, data, **kwargs):
+        kwargs.setdefault('headers', self.headers)
+        return await self.async_client.post(url, json.dumps(data), content_type='application/json', **kwargs)
+
+    async def test_start_and_submit(self):
+        response = await self.post(self.start_url, {'quiz_id': self.quiz.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {'message': 'Quiz started successfully'})
+
+        answers = [{'question_id': self.question.id, 'selected_answer': self.right.id}]
+        response = await self.post(self.submit_url, {'quiz_id': self.quiz.id, 'answers': answers})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            'message': 'Quiz submitted successfully',
+            'data': {'quiz_id': self.quiz.id, 'answers': answers, 'score': 3},
+        })
+
+        participant = await Participant.objects.aget(user=self.user, quiz=self.quiz)
+        self.assertEqual(participant.score, 3)
+        self.assertEqual((await QuizAttempt.objects.aget(user=self.user, quiz=self.quiz)).score, 3)
+        self.assertTrue(await LeaderboardEntry.objects.filter(quiz=self.quiz, user=self.user, score=3).aexists())
+
+    async def test_restart_adds_attempt(self):
+        await self.post(self.start_url, {'quiz_id': self.quiz.id})
+        await QuizAttempt.objects.filter(user=self.user, quiz=self.quiz).aupdate(score=10)
+
+        response = await self.post(self.start_url, {'quiz_id': self.quiz.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(await Participant.objects.filter(user=self.user, quiz=self.quiz).acount(), 1)
+        scores = [score async for score in QuizAttempt.objects.order_by('started_at').values_list('score', flat=True)]
+        self.assertEqual(scores, [10, None])
+
+    async def test_start_invalid_quiz(self):
+        for quiz_id in (self.quiz.id + 100, 'abc', None):
+            response = await self.post(self.start_url, {'quiz_id': quiz_id})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(response.json(), {'quiz_id': 'Invalid quiz ID'})
+
+    async def test_submit_errors(self):
+        answers = [{'question_id': self.question.id, 'selected_answer': self.right.id}]
+        wrong_answers = [{'question_id': self.question.id + 100, 'selected_answer': self.right.id}]
+        response = await self.post(self.submit_url, {'quiz_id': self.quiz.id, 'answers': answers})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json(), {'non_field_errors': ['Participant not found']})
+
+        response = await self.post(self.submit_url, {'quiz_id': self.quiz.id + 100, 'answers': wrong_answers})
+        self.assertEqual(response.json(), {'non_field_errors': ['Invalid quiz ID']})
+
+        response = await self.post(self.submit_url, {'quiz_id': self.quiz.id})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('answers', response.json())
+
+        attempt = await sync_to_async(start_attempt)(self.user, self.quiz.id, -1)
+        response = await self.post(self.submit_url, {'quiz_id': self.quiz.id, 'answers': wrong_answers})
+        self.assertEqual(response.json(),
+                         {'non_field_errors': ["Participant's time is over. Submission not allowed."]})
+
+        attempt.end_time = timezone.now() + timedelta(minutes=1)
+        await attempt.asave()
+        response = await self.post(self.submit_url, {'quiz_id': self.quiz.id, 'answers': wrong_answers})
+        self.assertEqual(response.json(), {'non_field_errors': ['question is not belong to the given Quiz']})
+
+    async def test_same_responses_as_sync_views(self):
+        await self.post(self.start_url, {'quiz_id': self.quiz.id})
+        data = {'quiz_id': self.quiz.id, 'answers': [
+            {'question_id': self.question.id, 'selected_answer': self.wrong.id}]}
+
+        response = await self.post(self.submit_url, data)
+        sync_response = await sync_to_async(self.client.post)(
+            reverse('quiz:submit-quiz'), data, content_type='application/json',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.content, sync_response.content)
+
+    async def test_authentication(self):
+        response = await self.post(self.start_url, {'quiz_id': self.quiz.id}, headers={})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+        self.assertEqual(response.json(), {'detail': 'Authentication credentials were not provided.'})
+
+        response = await self.post(self.start_url, {'quiz_id': self.quiz.id}, headers={'Authorization': 'Token bad'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), {'detail': 'Invalid token.'})
+
+        # The token -> user lookup is cached like with the sync authentication.
+        await self.post(self.start_url, {'quiz_id': self.quiz.id})
+        self.assertEqual(get_token_user_cache().get(self.token.key), self.user)
+
+    async def test_request_errors(self):
+        response = await self.async_client.get(self.start_url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+        response = await self.async_client.post(self.start_url, 'quiz_id=1',
+                                                content_type='application/x-www-form-urlencoded',
+                                                headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        response = await self.async_client.post(self.start_url, '{"quiz_id": ', content_type='application/json',
+                                                headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class QuizAttemptTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='taker')
+        self.client.force_authenticate(user=self.user)
+        self.quiz = Quiz.objects.create(title='Test Quiz', description='Test Description', time_limit=30,
+                                        created_by=self.user)
+        self.question = Question.objects.create(quiz=self.quiz, text='Test question', type='MC', points=2)
+        self.right = Answer.objects.create(question=self.question, text='Right', is_correct=True)
+        self.wrong = Answer.objects.create(question=self.question, text='Wrong', is_correct=False)
+        self.url = reverse('quiz:quiz-attempt-list', args=[self.quiz.id])
+
+    def take(self, answer):
+        self.client.post(reverse('quiz:start-quiz'), {'quiz_id': self.quiz.id})
+        response = self.client.post(reverse('quiz:submit-quiz'), {
+            'quiz_id': self.quiz.id,
+            'answers': [{'question_id': self.question.id, 'selected_answer': answer.id}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_submit_scores_latest_attempt(self):
+        self.take(self.wrong)
+        self.take(self.right)
+        self.client.post(reverse('quiz:start-quiz'), {'quiz_id': self.quiz.id})
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([attempt['score'] for attempt in response.data['results']], [None, 2, 0])
+        self.assertIsNone(response.data['results'][0]['submitted_at'])
+        self.assertIsNotNone(response.data['results'][1]['submitted_at'])
+
+    def test_submit_is_atomic(self):
+        self.client.post(reverse('quiz:start-quiz'), {'quiz_id': self.quiz.id})
+        data = {'quiz_id': self.quiz.id, 'answers': [{'question_id': self.question.id, 'selected_answer': self.right.id}]}
+
+        with mock.patch('quiz.attempts.record_score', side_effect=DatabaseError), self.assertLogs('django.request'):
+            with self.assertRaises(DatabaseError):
+                self.client.post(reverse('quiz:submit-quiz'), data, format='json')
+
+        self.assertIsNone(Participant.objects.get().score)
+        self.assertIsNone(QuizAttempt.objects.get().score)
+
+    def test_history_is_per_user(self):
+        self.take(self.right)
+        other = UserProfile.objects.create(username='other', email='other@example.com')
+        QuizAttempt.objects.create(user=other, quiz=self.quiz, started_at=timezone.now(), end_time=timezone.now())
+
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_history_uses_index(self):
+        queryset = QuizAttempt.objects.filter(user=self.user, quiz=self.quiz).order_by('-started_at', '-id')
+        self.assertIn('attempt_history_idx', queryset.explain())
+
+    def test_history_pages_attempts_started_together(self):
+        started_at = timezone.now()
+        attempts = QuizAttempt.objects.bulk_create([
+            QuizAttempt(user=self.user, quiz=self.quiz, started_at=started_at, end_time=started_at) for _ in range(3)
+        ])
+
+        ids, url = [], self.url + '?page_size=1'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            # Ties are broken by the id in the query itself, not by the storage order of the backend.
+            self.assertIn('ORDER BY "quiz_quizattempt"."started_at" DESC, "quiz_quizattempt"."id" DESC',
+                          queries[-1]['sql'])
+            ids += [attempt['id'] for attempt in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(ids, sorted((attempt.id for attempt in attempts), reverse=True))
+
 
 class SubmitQuizViewTest(APITestCase):
     def setUp(self):
@@ -319,8 +724,8 @@ class SubmitQuizViewTest(APITestCase):
 
         self.quiz = Quiz.objects.create(title='Test Quiz', description='Test Description', time_limit=30,
                                         created_by=self.user)
-        self.participant = Participant.objects.create(user=self.user, quiz=self.quiz, start_time=timezone.now(),
-                                                      end_time=timezone.now() + timedelta(minutes=self.quiz.time_limit))
+        self.attempt = start_attempt(self.user, self.quiz.id, self.quiz.time_limit)
+        self.participant = Participant.objects.get(user=self.user, quiz=self.quiz)
         self.question1 = Question.objects.create(quiz=self.quiz, text='Test question 1', type='MC', points=3)
         self.answer1 = Answer.objects.create(question=self.question1, text='Answer 1', is_correct=False)
         self.answer2 = Answer.objects.create(question=self.question1, text='Answer 2', is_correct=True)
@@ -367,6 +772,399 @@ class SubmitQuizViewTest(APITestCase):
         response = self.client.post(self.url, data)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.data['non_field_errors'], ["Invalid quiz ID"])
+
+    def test_submit_quiz_invalid_quiz_id_is_checked_before_answers(self):
+        data = {'quiz_id': 999, 'answers': [{'question_id': self.question1.id, 'selected_answer': self.answer2.id}]}
+
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.data['non_field_errors'], ["Invalid quiz ID"])
+        self.assertIsNone(get_answer_key_cache().local.get(999))
+
+    def test_submit_quiz_time_is_over(self):
+        QuizAttempt.objects.filter(pk=self.attempt.pk).update(end_time=timezone.now() - timedelta(seconds=1))
+        data = {
+            'quiz_id': self.quiz.id,
+            'answers': [{'question_id': self.question1.id, 'selected_answer': self.answer3.id}]
+        }
+
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], ["Participant's time is over. Submission not allowed."])
+
+        # Valid answers are refused by the UPDATE recording them.
+        data['answers'] = [{'question_id': self.question1.id, 'selected_answer': self.answer2.id}]
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.data['non_field_errors'], ["Participant's time is over. Submission not allowed."])
+
+        self.participant.refresh_from_db()
+        self.assertIsNone(self.participant.score)
+
+    def test_submit_quiz_not_started(self):
+        self.participant.delete()
+        self.attempt.delete()
+        data = {'quiz_id': self.quiz.id, 'answers': []}
+
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['non_field_errors'], ["Participant not found"])
+
+    def test_submit_quiz_answer_of_other_question(self):
+        data = {
+            'quiz_id': self.quiz.id,
+            'answers': [
+                {
+                    'question_id': self.question1.id,
+                    'selected_answer': self.answer3.id
+                },
+            ]
+        }
+
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.participant.refresh_from_db()
+        self.assertIsNone(self.participant.score)
+
+    def test_submit_quiz_question_scored_once(self):
+        data = {
+            'quiz_id': self.quiz.id,
+            'answers': [
+                {
+                    'question_id': self.question1.id,
+                    'selected_answer': self.answer2.id
+                },
+                {
+                    'question_id': self.question1.id,
+                    'selected_answer': self.answer2.id
+                },
+            ]
+        }
+
+        response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.participant.refresh_from_db()
+        self.assertEqual(self.participant.score, 3)
+
+    def test_submit_quiz_query_count_is_constant(self):
+        for i in range(50):
+            question = Question.objects.create(quiz=self.quiz, text=f'Extra question {i}', type='MC', points=1)
+            Answer.objects.create(question=question, text='Right', is_correct=True)
+            Answer.objects.create(question=question, text='Wrong', is_correct=False)
+
+        answers = [
+            {'question_id': question.id, 'selected_answer': question.answers.get(is_correct=True).id}
+            for question in self.quiz.questions.all()
+        ]
+        data = {'quiz_id': self.quiz.id, 'answers': answers}
+
+        # 2 queries to load the answer key, then in a savepoint (2): the attempt UPDATE, which checks the deadline,
+        # the participant UPDATE and 10 queries to create the leaderboard entry and its bucket.
+        with self.assertNumQueries(16):
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.participant.refresh_from_db()
+        self.assertEqual(self.participant.score, 66)
+
+
+class AnswerKeyCacheTest(APITestCase):
+    def setUp(self):
+        self.url = reverse('quiz:submit-quiz')
+        self.user = UserProfile.objects.create(username='admin')
+        self.client.force_authenticate(user=self.user)
+
+        self.quiz = Quiz.objects.create(title='Test Quiz', description='Test Description', time_limit=30,
+                                        created_by=self.user)
+        start_attempt(self.user, self.quiz.id, self.quiz.time_limit)
+        self.question = Question.objects.create(quiz=self.quiz, text='Test question', type='MC', points=4)
+        self.right = Answer.objects.create(question=self.question, text='Right', is_correct=True)
+        self.wrong = Answer.objects.create(question=self.question, text='Wrong', is_correct=False)
+
+        self.data = {
+            'quiz_id': self.quiz.id,
+            'answers': [{'question_id': self.question.id, 'selected_answer': self.wrong.id}]
+        }
+
+    def submit(self):
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['data']['score']
+
+    def test_cached_key_skips_question_tables(self):
+        self.submit()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.submit()
+
+        tables = (Question._meta.db_table, Answer._meta.db_table)
+        for query in queries.captured_queries:
+            self.assertFalse(any(table in query['sql'] for table in tables), query['sql'])
+
+    def test_answer_change_invalidates_key(self):
+        self.assertEqual(self.submit(), 0)
+
+        self.wrong.is_correct = True
+        self.wrong.save()
+        self.assertEqual(self.submit(), 4)
+
+        self.question.points = 6
+        self.question.save()
+        self.assertEqual(self.submit(), 6)
+
+        self.wrong.delete()
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_shared_cache_versioning(self):
+        with override_settings(QUIZ_ANSWER_KEY_CACHE={'MAX_ENTRIES': 8, 'CACHE_ALIAS': 'default'}):
+            cache = get_answer_key_cache()
+            self.assertEqual(self.submit(), 0)
+            stale_entry = cache.local.get(self.quiz.id)
+
+            self.wrong.is_correct = True
+            self.wrong.save()
+
+            # Another worker still holding the old entry must notice the bumped shared version.
+            cache.local.set(self.quiz.id, stale_entry)
+            self.assertEqual(self.submit(), 4)
+
+    def test_local_entries_expire(self):
+        with override_settings(QUIZ_ANSWER_KEY_CACHE={'MAX_ENTRIES': 8, 'LOCAL_TIMEOUT': 5}):
+            self.assertEqual(self.submit(), 0)
+
+            # As in a worker the invalidation does not reach, the old key is used until it expires.
+            Answer.objects.filter(pk=self.wrong.pk).update(is_correct=True)
+            self.assertEqual(self.submit(), 0)
+
+            with mock.patch('QuizAPI.cache.time.monotonic', return_value=time.monotonic() + 6):
+                self.assertEqual(self.submit(), 4)
+
+    def test_lru_eviction(self):
+        cache = LocalLRUCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+
+
+class QuizDeliveryViewTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='taker')
+        self.client.force_authenticate(user=self.user)
+        self.quiz = Quiz.objects.create(title='Exam', description='Description', time_limit=30, created_by=self.user)
+        self.question = Question.objects.create(quiz=self.quiz, text='Question ' * 200, type='MC', points=2)
+        self.right = Answer.objects.create(question=self.question, text='Right', is_correct=True)
+        self.wrong = Answer.objects.create(question=self.question, text='Wrong', is_correct=False)
+        self.url = reverse('quiz:quiz-delivery', args=[self.quiz.id])
+
+    def test_payload_hides_correct_answers(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content), {
+            'id': self.quiz.id,
+            'title': 'Exam',
+            'description': 'Description',
+            'time_limit': 30,
+            'questions': [{
+                'id': self.question.id, 'text': self.question.text, 'type': 'MC', 'points': 2,
+                'answers': [{'id': self.right.id, 'text': 'Right'}, {'id': self.wrong.id, 'text': 'Wrong'}],
+            }],
+        })
+
+    def test_payload_is_rendered_once(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_gzip_variant(self):
+        plain = self.client.get(self.url)
+        self.assertNotIn('Content-Encoding', plain)
+
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+        # Each encoding has its own ETag, which only revalidates that encoding.
+        self.assertNotEqual(response['ETag'], plain['ETag'])
+        revalidated = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        self.assertIn('Accept-Encoding', revalidated['Vary'])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+                         status.HTTP_200_OK)
+
+    def test_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=f'W/{etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_local_entries_expire(self):
+        with override_settings(QUIZ_DELIVERY_CACHE={'LOCAL_TIMEOUT': 5}):
+            self.client.get(self.url)
+
+            # As in a worker the invalidation does not reach, the old payload is served until it expires.
+            Quiz.objects.filter(pk=self.quiz.pk).update(title='Final exam')
+            self.assertEqual(json.loads(self.client.get(self.url).content)['title'], 'Exam')
+
+            with mock.patch('QuizAPI.cache.time.monotonic', return_value=time.monotonic() + 6):
+                self.assertEqual(json.loads(self.client.get(self.url).content)['title'], 'Final exam')
+
+    def test_shared_cache_versioning(self):
+        with override_settings(QUIZ_DELIVERY_CACHE={'CACHE_ALIAS': 'default'}):
+            self.client.get(self.url)
+            cache = get_delivery_cache()
+            stale_entry = cache.local.get(self.quiz.id)
+
+            Quiz.objects.filter(pk=self.quiz.pk).update(title='Final exam')
+            invalidate_delivery_payload(self.quiz.id)
+
+            # Another worker still holding the old entry must notice the bumped shared version.
+            cache.local.set(self.quiz.id, stale_entry)
+            self.assertEqual(json.loads(self.client.get(self.url).content)['title'], 'Final exam')
+
+            # An evicted version does not come back to the version of the stale entry.
+            caches['default'].delete(cache.version_key(self.quiz.id))
+            cache.local.set(self.quiz.id, stale_entry)
+            self.assertEqual(json.loads(self.client.get(self.url).content)['title'], 'Final exam')
+
+    def test_content_change_rebuilds_payload(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.wrong.text = 'Other'
+        self.wrong.save()
+        response = self.client.get(self.url)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(json.loads(response.content)['questions'][0]['answers'][1]['text'], 'Other')
+
+        self.quiz.title = 'Final exam'
+        self.quiz.save()
+        self.assertEqual(json.loads(self.client.get(self.url).content)['title'], 'Final exam')
+
+    def test_invalid_quiz(self):
+        response = self.client.get(reverse('quiz:quiz-delivery', args=[self.quiz.id + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LeaderboardViewTest(APITestCase):
+    def setUp(self):
+        self.owner = UserProfile.objects.create(username='owner', email='owner@example.com')
+        self.quiz = Quiz.objects.create(title='Test Quiz', description='Test Description', time_limit=30,
+                                        created_by=self.owner)
+        self.question = Question.objects.create(quiz=self.quiz, text='Test question', type='MC', points=5)
+        self.right = Answer.objects.create(question=self.question, text='Right', is_correct=True)
+        self.wrong = Answer.objects.create(question=self.question, text='Wrong', is_correct=False)
+        self.bonus = Question.objects.create(quiz=self.quiz, text='Bonus question', type='TF', points=2)
+        self.bonus_right = Answer.objects.create(question=self.bonus, text='True', is_correct=True)
+
+        self.url = reverse('quiz:leaderboard', kwargs={'pk': self.quiz.pk})
+
+    def take_quiz(self, username, answers):
+        user, _ = UserProfile.objects.get_or_create(username=username, email=f'{username}@example.com')
+        self.client.force_authenticate(user=user)
+        self.client.post(reverse('quiz:start-quiz'), {'quiz_id': self.quiz.id})
+        data = {
+            'quiz_id': self.quiz.id,
+            'answers': [
+                {'question_id': answer.question_id, 'selected_answer': answer.id} for answer in answers
+            ]
+        }
+        response = self.client.post(reverse('quiz:submit-quiz'), data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return user
+
+    def test_leaderboard_ranking(self):
+        self.take_quiz('alice', [self.right, self.bonus_right])
+        self.take_quiz('bob', [self.right])
+        self.take_quiz('carol', [self.right])
+        dave = self.take_quiz('dave', [self.wrong])
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        ranking = [(entry['rank'], entry['username'], entry['score']) for entry in response.data['results']]
+        self.assertEqual(ranking, [(1, 'alice', 7), (2, 'bob', 5), (2, 'carol', 5), (4, 'dave', 0)])
+        self.assertEqual(response.data['me'], {'rank': 4, 'score': 0})
+
+        response = self.client.get(self.url, {'limit': 1})
+        self.assertEqual(len(response.data['results']), 1)
+
+        self.client.force_authenticate(user=dave)
+        self.take_quiz('dave', [self.right, self.bonus_right])
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['me'], {'rank': 1, 'score': 7})
+        self.assertEqual(ScoreBucket.objects.get(quiz=self.quiz, score=0).count, 0)
+        self.assertEqual(ScoreBucket.objects.get(quiz=self.quiz, score=7).count, 2)
+
+    def test_deleted_entries_leave_the_ranking(self):
+        alice = self.take_quiz('alice', [self.right, self.bonus_right])
+        self.take_quiz('bob', [self.right])
+        carol = self.take_quiz('carol', [self.wrong])
+
+        alice.delete()
+        LeaderboardEntry.objects.get(user=carol).delete()
+        self.assertEqual(dict(ScoreBucket.objects.filter(quiz=self.quiz).values_list('score', 'count')),
+                         {0: 0, 5: 1, 7: 0})
+
+        self.client.force_authenticate(user=UserProfile.objects.get(username='bob'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['me'], {'rank': 1, 'score': 5})
+        self.assertEqual(rank_of(self.quiz.id, 5), (1, 1))
+
+        self.quiz.delete()
+        self.assertFalse(ScoreBucket.objects.exists())
+
+    def test_my_rank_query_count(self):
+        user = self.take_quiz('alice', [self.right])
+        for i in range(30):
+            self.take_quiz(f'user{i}', [self.right, self.bonus_right] if i % 2 else [self.wrong])
+
+        self.client.force_authenticate(user=user)
+        # quiz, my entry, my rank and the top entries
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'limit': 5})
+        self.assertEqual(response.data['me'], {'rank': 16, 'score': 5})
+
+    def test_leaderboard_invalid_quiz_id(self):
+        response = self.client.get(reverse('quiz:leaderboard', kwargs={'pk': 999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_limit(self):
+        for limit in ('-1', '0', 'a'):
+            response = self.client.get(self.url, {'limit': limit})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('limit', response.data)
+
+    def test_migration_fills_leaderboards(self):
+        now = timezone.now()
+        for index, score in enumerate((5, 7, 5, None)):
+            user = UserProfile.objects.create(username=f'user{index}', email=f'user{index}@example.com')
+            Participant.objects.create(user=user, quiz=self.quiz, start_time=now, end_time=now, score=score)
+
+        migration = import_module('quiz.migrations.0002_leaderboard')
+        migration.fill_leaderboards(apps, connection.schema_editor())
+
+        self.assertEqual(LeaderboardEntry.objects.filter(quiz=self.quiz).count(), 3)
+        self.assertEqual(dict(ScoreBucket.objects.filter(quiz=self.quiz).values_list('score', 'count')), {5: 2, 7: 1})
+        response = self.client.get(self.url)
+        self.assertEqual([entry['rank'] for entry in response.data['results']], [1, 2, 2])
+
 
 class QuestionListCreateViewTest(APITestCase):
     def setUp(self):
@@ -420,7 +1218,7 @@ class QuestionListCreateViewTest(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        data = response.data
+        data = response.data['results']
         self.assertEqual(len(data), 2)
 
         question1 = data[0]
@@ -436,6 +1234,50 @@ class QuestionListCreateViewTest(APITestCase):
         self.assertEqual(question2['points'], 1)
 
 
+class QuestionBulkCreateViewTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='admin', is_staff=True)
+        self.client.force_authenticate(user=self.user)
+        self.quiz = Quiz.objects.create(title='Test Quiz', description='Test Description', time_limit=20,
+                                        created_by=self.user)
+        self.url = reverse('quiz:question-bulk-create', kwargs={'pk': self.quiz.pk})
+
+    def test_bulk_create_questions(self):
+        data = [
+            {
+                'text': f'Question {i}',
+                'type': 'MC',
+                'points': 2,
+                'answers': [
+                    {'text': 'Answer 1', 'is_correct': True},
+                    {'text': 'Answer 2', 'is_correct': False},
+                    {'text': 'Answer 3', 'is_correct': False},
+                ]
+            }
+            for i in range(600)
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertLessEqual(len(inserts), 12)
+
+        self.assertEqual(len(response.data), 600)
+        self.assertEqual(len(response.data[599]['answers']), 3)
+        self.assertEqual(self.quiz.questions.count(), 600)
+        self.assertEqual(Answer.objects.filter(question__quiz=self.quiz).count(), 1800)
+
+    def test_bulk_create_invalid_quiz_id(self):
+        url = reverse('quiz:question-bulk-create', kwargs={'pk': 999})
+        data = [{'text': 'Question', 'type': 'MC', 'points': 2}]
+
+        response = self.client.post(url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Question.objects.exists())
+
+
 class QuestionRetrieveUpdateDeleteViewTest(APITestCase):
     def setUp(self):
         self.user = UserProfile.objects.create(username='admin', is_staff=True)
@@ -595,7 +1437,7 @@ class FeedbackListCreateViewTest(APITestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        data = response.data
+        data = response.data['results']
         self.assertEqual(len(data), 2)
 
         feedback1 = data[0]
@@ -645,3 +1487,692 @@ class FeedbackRetrieveUpdateDeleteViewTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
         self.assertFalse(Feedback.objects.filter(pk=self.feedback.pk).exists())
+
+
+class RequestMetricsMiddlewareTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='admin')
+        self.client.force_authenticate(user=self.user)
+        Category.objects.create(name='Category 1')
+        self.url = reverse('quiz:category-list-create')
+
+    @override_settings(REQUEST_METRICS={'ENABLED': True, 'SLOW_REQUEST_MS': 10000})
+    def test_server_timing_header(self):
+        with self.assertLogs('QuizAPI.requests', level='INFO') as logs:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertIn('db;dur=', response['Server-Timing'])
+        # The ETag state and the categories
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+
+        metrics = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        self.assertEqual(metrics['path'], self.url)
+        self.assertEqual(metrics['status'], 200)
+        self.assertEqual(metrics['queries'], 2)
+        self.assertAlmostEqual(metrics['db_ms'] + metrics['app_ms'], metrics['total_ms'], delta=0.02)
+        self.assertNotIn('worst_queries', metrics)
+
+    @override_settings(REQUEST_METRICS={'ENABLED': True, 'SLOW_REQUEST_MS': 0, 'WORST_QUERIES': 1})
+    def test_slow_request_logs_worst_queries(self):
+        with self.assertLogs('QuizAPI.requests', level='WARNING') as logs:
+            self.client.get(self.url)
+
+        metrics = json.loads(logs.records[0].getMessage())
+        self.assertEqual(len(metrics['worst_queries']), 1)
+        self.assertIn(Category._meta.db_table, metrics['worst_queries'][0]['sql'])
+
+    @override_settings(REQUEST_METRICS={'ENABLED': True, 'SLOW_REQUEST_MS': 10000})
+    async def test_counts_queries_of_async_views(self):
+        quiz = await Quiz.objects.acreate(title='Test Quiz', description='Test Description', time_limit=30,
+                                          created_by=self.user)
+        token = await Token.objects.aget(user=self.user)
+        with self.assertLogs('QuizAPI.requests', level='INFO') as logs:
+            response = await self.async_client.post(
+                reverse('quiz:async-start-quiz'), json.dumps({'quiz_id': quiz.id}), content_type='application/json',
+                headers={'Authorization': f'Token {token.key}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        # The token and the quiz, then the attempt and the participant inside a savepoint, both in ORM threads
+        metrics = json.loads(logs.records[0].getMessage())
+        self.assertEqual(metrics['queries'], 6)
+        self.assertIn('desc="6 queries"', response['Server-Timing'])
+
+    @override_settings(REQUEST_METRICS={'ENABLED': False})
+    def test_disabled(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class CreateQuizzesCommandTest(TestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='admin', email='admin@example.com')
+        for name in ('Science', 'History', 'Maths'):
+            Category.objects.create(name=name)
+        for name in ('easy', 'hard', 'exam', 'practice'):
+            Tag.objects.create(name=name)
+
+    def snapshot(self):
+        return [
+            (quiz.title, quiz.time_limit, sorted(quiz.categories.values_list('name', flat=True)),
+             sorted(quiz.tags.values_list('name', flat=True)),
+             [(question.text, question.points, [(answer.text, answer.is_correct) for answer in question.answers.all()])
+              for question in quiz.questions.all()])
+            for quiz in Quiz.objects.order_by('id')
+        ]
+
+    def test_seeded_output_is_reproducible(self):
+        call_command('create_quizzes', 5, 3, seed=42, batch_size=2, stdout=StringIO())
+        first_run = self.snapshot()
+
+        self.assertEqual(len(first_run), 5)
+        self.assertEqual(Question.objects.count(), 15)
+        self.assertTrue(all(len(quiz[2]) == 2 and len(quiz[3]) == 3 for quiz in first_run))
+
+        Quiz.objects.all().delete()
+        call_command('create_quizzes', 5, 3, seed=42, batch_size=2, stdout=StringIO())
+        self.assertEqual(self.snapshot(), first_run)
+
+
+class QuizSearchViewTest(APITestCase):
+    def setUp(self):
+        self.url = reverse('quiz:quiz-search')
+        self.user = UserProfile.objects.create(username='admin', is_staff=True)
+        self.science = Category.objects.create(name='Science')
+        self.history = Category.objects.create(name='History')
+        self.exam = Tag.objects.create(name='exam')
+
+        # Quizzes are indexed when the transaction commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.physics = Quiz.objects.create(title='Physics basics', description='Forces and motion',
+                                               time_limit=10, created_by=self.user)
+            self.physics.categories.set([self.science])
+            self.physics.tags.set([self.exam])
+
+            self.war = Quiz.objects.create(title='World wars', description='Battles and treaties', time_limit=10,
+                                           created_by=self.user)
+            self.war.categories.set([self.history])
+
+            Question.objects.create(quiz=self.physics, text='What is the unit of energy?', type='MC', points=1)
+            Question.objects.create(quiz=self.war, text='Which energy crisis followed the war?', type='MC', points=1)
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result['id'] for result in response.data['results']]
+
+    def test_search_title_description_and_questions(self):
+        self.assertEqual(self.search(q='physics'), [self.physics.id])
+        self.assertEqual(self.search(q='treaties'), [self.war.id])
+        self.assertEqual(self.search(q='unit energy'), [self.physics.id])
+        self.assertEqual(self.search(q='volcano'), [])
+
+    def test_title_matches_rank_first(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Quiz.objects.create(title='Energy', description='Power and work', time_limit=10, created_by=self.user)
+        results = self.search(q='energy')
+        self.assertEqual(len(results), 3)
+        self.assertEqual(Quiz.objects.get(id=results[0]).title, 'Energy')
+
+    def test_last_word_matches_as_prefix(self):
+        self.assertEqual(self.search(q='phys'), [self.physics.id])
+
+    def test_search_with_filters(self):
+        self.assertEqual(self.search(q='energy', categories=str(self.history.id)), [self.war.id])
+        self.assertEqual(self.search(q='energy', tags=str(self.exam.id)), [self.physics.id])
+        self.assertEqual(self.search(q='energy', categories=f'{self.science.id},{self.history.id}',
+                                     tags=str(self.exam.id)), [self.physics.id])
+
+    def test_search_query_syntax_is_ignored(self):
+        self.assertEqual(self.search(q='"physics" OR NEAR(*'), [])
+        self.assertEqual(self.search(q='physics*'), [self.physics.id])
+
+    def test_index_follows_changes(self):
+        self.physics.title = 'Mechanics'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.physics.save()
+        self.assertEqual(self.search(q='mechanics'), [self.physics.id])
+        self.assertEqual(self.search(q='physics'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(quiz=self.war, text='Who signed the armistice?', type='MC', points=1)
+        self.assertEqual(self.search(q='armistice'), [self.war.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.war.delete()
+        self.assertEqual(self.search(q='energy'), [self.physics.id])
+
+    def test_pagination(self):
+        response = self.client.get(self.url, {'q': 'energy', 'limit': 1})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['next_offset'], 1)
+
+        response = self.client.get(self.url, {'q': 'energy', 'limit': 1, 'offset': 1})
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'q': 'energy', 'tags': 'a'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        for params in ({'limit': '0'}, {'limit': '-1'}, {'limit': 'a'}, {'offset': '-1'}, {'offset': 'a'}):
+            response = self.client.get(self.url, dict(params, q='energy'))
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertEqual(list(response.data), list(params))
+
+    def test_seeded_quizzes_are_indexed(self):
+        call_command('create_quizzes', 3, 2, seed=1, stdout=StringIO())
+        quiz = Quiz.objects.order_by('-id').first()
+        self.assertIn(quiz.id, self.search(q=quiz.title))
+
+    def test_rebuild_search_index(self):
+        Quiz.objects.filter(id=self.physics.id).update(title='Optics')
+        self.assertEqual(self.search(q='optics'), [])
+
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search(q='optics'), [self.physics.id])
+
+
+class QuizFacetFilterTest(APITestCase):
+    def setUp(self):
+        self.url = reverse('quiz:quiz-list-create')
+        self.user = UserProfile.objects.create(username='admin', is_staff=True)
+        self.science = Category.objects.create(name='Science')
+        self.history = Category.objects.create(name='History')
+        self.easy = Tag.objects.create(name='easy')
+        self.exam = Tag.objects.create(name='exam')
+
+        self.quizzes = {}
+        # Quizzes are indexed when the transaction commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            for title, categories, tags in (
+                    ('Physics', [self.science], [self.easy]),
+                    ('Chemistry', [self.science], [self.exam]),
+                    ('History of science', [self.science, self.history], [self.easy, self.exam]),
+                    ('Revolutions', [self.history], [])):
+                quiz = Quiz.objects.create(title=title, description='Description', time_limit=10,
+                                           created_by=self.user)
+                quiz.categories.set(categories)
+                quiz.tags.set(tags)
+                self.quizzes[title] = quiz.id
+
+    def titles(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return sorted(quiz['title'] for quiz in response.data['results'])
+
+    def test_filter_any(self):
+        self.assertEqual(self.titles(categories=f'{self.history.id}'), ['History of science', 'Revolutions'])
+        self.assertEqual(self.titles(categories=f'{self.science.id},{self.history.id}'),
+                         ['Chemistry', 'History of science', 'Physics', 'Revolutions'])
+        self.assertEqual(self.titles(categories=f'{self.science.id}', tags=f'{self.exam.id}'),
+                         ['Chemistry', 'History of science'])
+
+    def test_filter_all(self):
+        self.assertEqual(self.titles(categories=f'{self.science.id},{self.history.id}', match='all'),
+                         ['History of science'])
+        self.assertEqual(self.titles(tags=f'{self.easy.id},{self.exam.id}', match='all'), ['History of science'])
+        self.assertEqual(self.titles(categories=f'{self.history.id}', tags=f'{self.easy.id}', match='all'),
+                         ['History of science'])
+
+    def test_facet_counts(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'categories': str(self.science.id), 'facets': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['facets'], {
+            'categories': [
+                {'id': self.science.id, 'name': 'Science', 'count': 3},
+                {'id': self.history.id, 'name': 'History', 'count': 1},
+            ],
+            'tags': [
+                {'id': self.easy.id, 'name': 'easy', 'count': 2},
+                {'id': self.exam.id, 'name': 'exam', 'count': 2},
+            ],
+        })
+        facet_queries = [query for query in queries.captured_queries if 'UNION' in query['sql']]
+        self.assertEqual(len(facet_queries), 1)
+
+    def test_no_facets_by_default(self):
+        response = self.client.get(self.url)
+        self.assertNotIn('facets', response.data)
+
+    def test_invalid_filters(self):
+        self.assertEqual(self.client.get(self.url, {'categories': 'a'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'match': 'some'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_uses_filters(self):
+        response = self.client.get(reverse('quiz:quiz-search'), {
+            'q': 'description', 'tags': f'{self.easy.id},{self.exam.id}', 'match': 'all'})
+        self.assertEqual([quiz['id'] for quiz in response.data['results']], [self.quizzes['History of science']])
+
+
+# The response cache answers repeated GETs itself, these tests cover the database path.
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='admin', is_staff=True)
+        # Quizzes are touched when the transaction commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz = Quiz.objects.create(title='Quiz', description='Description', time_limit=10,
+                                            created_by=self.user)
+            self.question = Question.objects.create(quiz=self.quiz, text='Question', type='MC', points=1)
+            self.answer = Answer.objects.create(question=self.question, text='Answer', is_correct=True)
+        self.url = reverse('quiz:quiz-retrieve-update-delete', args=[self.quiz.id])
+
+    def assertNotModified(self, url, etag, queries=1):
+        # The state query only, nothing is serialized.
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+    def test_retrieve_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        self.assertNotModified(self.url, response['ETag'])
+
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_answer_change_propagates_to_quiz(self):
+        etag = self.client.get(self.url)['ETag']
+        version = Quiz.objects.get(id=self.quiz.id).version
+
+        self.answer.text = 'Changed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.answer.save()
+
+        self.assertEqual(Quiz.objects.get(id=self.quiz.id).version, version + 1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_quiz_is_touched_once_per_transaction(self):
+        version = Quiz.objects.get(id=self.quiz.id).version
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for i in range(3):
+                question = Question.objects.create(quiz=self.quiz, text=f'Question {i}', type='MC', points=1)
+                Answer.objects.create(question=question, text='Answer', is_correct=True)
+            self.assertEqual(Quiz.objects.get(id=self.quiz.id).version, version)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(Quiz.objects.get(id=self.quiz.id).version, version + 1)
+
+    def test_changes_of_rolled_back_savepoints_are_dropped(self):
+        version = Quiz.objects.get(id=self.quiz.id).version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                Question.objects.create(quiz=self.quiz, text='Rolled back', type='MC', points=1)
+                raise DatabaseError
+            self.answer.save()
+
+        self.assertEqual(Quiz.objects.get(id=self.quiz.id).version, version + 1)
+
+    def test_question_changes_propagate_to_quiz(self):
+        question_url = reverse('quiz:question-retrieve-update-delete', args=[self.question.id])
+        questions_url = reverse('quiz:question-list-create', args=[self.quiz.id])
+        etags = [self.client.get(url)['ETag'] for url in (self.url, question_url, questions_url)]
+        self.assertNotModified(question_url, etags[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(quiz=self.quiz, text='Other question', type='TF', points=1)
+
+        for url, etag in zip((self.url, question_url, questions_url), etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_list_not_modified(self):
+        url = reverse('quiz:quiz-list-create')
+        etag = self.client.get(url)['ETag']
+        # Answered from the generations of the response cache.
+        self.assertNotModified(url, etag, queries=0)
+
+        # Another page or filter is another representation.
+        response = self.client.get(url, {'page_size': 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        Quiz.objects.create(title='Other quiz', description='Description', time_limit=10, created_by=self.user)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_list_deletion_changes_etag(self):
+        other = Quiz.objects.create(title='Other quiz', description='Description', time_limit=10,
+                                    created_by=self.user)
+        url = reverse('quiz:quiz-list-create')
+        etag = self.client.get(url)['ETag']
+
+        other.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_list_follows_question_changes(self):
+        url = reverse('quiz:quiz-list-create')
+        etag = self.client.get(url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Question.objects.create(quiz=self.quiz, text='Other question', type='TF', points=1)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        # A generation evicted from the cache does not come back to an older value.
+        etag = self.client.get(url)['ETag']
+        get_response_cache().cache.clear()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_category_and_tag(self):
+        category = Category.objects.create(name='Science')
+        url = reverse('quiz:category-retrieve-update-delete', args=[category.id])
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, etag)
+
+        self.client.force_authenticate(user=self.user)
+        self.client.put(url, {'name': 'Physics'})
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        url = reverse('quiz:tag-list-create')
+        self.assertNotModified(url, self.client.get(url)['ETag'])
+
+    def test_link_changes_propagate_to_quiz(self):
+        tag = Tag.objects.create(name='Physics')
+        category = Category.objects.create(name='Science')
+        # Quizzes are touched when the transaction commits.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.quiz.tags.add(tag)
+            self.quiz.categories.add(category)
+
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            tag.delete()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            category.quiz_set.clear()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        etag = self.client.get(self.url)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            category.quiz_set.add(self.quiz)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_facets_follow_category_renames(self):
+        category = Category.objects.create(name='Science')
+        self.quiz.categories.add(category)
+        url = reverse('quiz:quiz-list-create')
+        etag = self.client.get(url, {'facets': 'true'})['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'facets': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        category.name = 'Physics'
+        category.save()
+        response = self.client.get(url, {'facets': 'true'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['facets']['categories'][0]['name'], 'Physics')
+
+    def test_missing_quiz(self):
+        url = reverse('quiz:quiz-retrieve-update-delete', args=[self.quiz.id + 100])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='"anything"').status_code,
+                         status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': True, 'CACHE_ALIAS': 'responses', 'TIMEOUT': 300,
+                                   'MAX_BYTES': 1024 * 1024})
+class ResponseCacheTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='admin', is_staff=True)
+        self.category = Category.objects.create(name='Science')
+        self.quiz = Quiz.objects.create(title='Quiz', description='Description', time_limit=10, created_by=self.user)
+        self.quiz.categories.set([self.category])
+        self.question = Question.objects.create(quiz=self.quiz, text='Question', type='MC', points=1)
+        self.answer = Answer.objects.create(question=self.question, text='Answer', is_correct=True)
+        self.quiz_url = reverse('quiz:quiz-retrieve-update-delete', args=[self.quiz.id])
+        self.categories_url = reverse('quiz:category-list-create')
+
+    def assertCached(self, url):
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        return response
+
+    def assertNotCached(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        return response
+
+    def test_hit_skips_database_and_serializers(self):
+        first = self.assertNotCached(self.quiz_url)
+        second = self.assertCached(self.quiz_url)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['Content-Type'], first['Content-Type'])
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        response = self.client.get(self.quiz_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_hit_answers_conditional_requests_like_a_miss(self):
+        first = self.assertNotCached(self.quiz_url)
+        conditions = [
+            {'HTTP_IF_NONE_MATCH': f'W/{first["ETag"]}'},
+            {'HTTP_IF_NONE_MATCH': f'"other", {first["ETag"]}'},
+            {'HTTP_IF_NONE_MATCH': '*'},
+            {'HTTP_IF_MODIFIED_SINCE': first['Last-Modified']},
+        ]
+        for headers in conditions:
+            with self.subTest(headers=headers), self.assertNumQueries(0):
+                response = self.client.get(self.quiz_url, **headers)
+                self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+                self.assertEqual(response['X-Cache'], 'HIT')
+                self.assertEqual(response['ETag'], first['ETag'])
+
+        response = self.client.get(self.quiz_url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content, first.content)
+
+    def test_keys_depend_on_role_and_format(self):
+        self.assertNotCached(self.categories_url)
+        self.assertCached(self.categories_url)
+
+        self.assertNotCached(self.categories_url + '?format=api')
+
+        self.client.force_authenticate(user=self.user)
+        self.assertNotCached(self.categories_url)
+        self.assertCached(self.categories_url)
+
+    def test_writes_invalidate(self):
+        self.assertNotCached(self.quiz_url)
+        self.answer.text = 'Changed'
+        self.answer.save()
+        self.assertIn(b'Changed', self.assertNotCached(self.quiz_url).content)
+
+        self.quiz.tags.set([Tag.objects.create(name='exam')])
+        self.assertNotCached(self.quiz_url)
+
+        self.assertCached(self.quiz_url)
+        self.category.delete()
+        self.assertEqual(self.assertNotCached(self.quiz_url).data['categories'], [])
+
+        self.assertNotCached(self.categories_url)
+        Category.objects.create(name='History')
+        self.assertEqual(len(self.assertNotCached(self.categories_url).data), 1)
+
+    def test_other_quizzes_stay_cached(self):
+        other = Quiz.objects.create(title='Other', description='Description', time_limit=10, created_by=self.user)
+        other_url = reverse('quiz:quiz-retrieve-update-delete', args=[other.id])
+        self.assertNotCached(other_url)
+
+        Question.objects.create(quiz=self.quiz, text='New question', type='TF', points=1)
+        self.assertCached(other_url)
+
+    def test_errors_are_not_cached(self):
+        url = reverse('quiz:quiz-retrieve-update-delete', args=[self.quiz.id + 100])
+        for _ in range(2):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertNotEqual(response.get('X-Cache'), 'HIT')
+
+    def test_stats(self):
+        get_response_cache().counters.clear()
+        self.client.get(self.quiz_url)
+        self.client.get(self.quiz_url)
+        self.client.get(self.categories_url)
+
+        url = reverse('quiz:response-cache-stats')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {
+            'hits': 1,
+            'misses': 2,
+            'namespaces': {'quiz': {'hits': 1, 'misses': 1}, 'categories': {'hits': 0, 'misses': 1}},
+        })
+
+
+@override_settings(RESPONSE_CACHE={'ENABLED': False})
+class SparseFieldsTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='admin', is_staff=True)
+        self.tag = Tag.objects.create(name='easy')
+        self.quiz = Quiz.objects.create(title='Quiz', description='Description', time_limit=10, created_by=self.user)
+        self.quiz.tags.add(self.tag)
+        self.question = Question.objects.create(quiz=self.quiz, text='Question', type='MC', points=1)
+        self.answer = Answer.objects.create(question=self.question, text='Answer', is_correct=True)
+        self.list_url = reverse('quiz:quiz-list-create')
+        self.url = reverse('quiz:quiz-retrieve-update-delete', args=[self.quiz.id])
+
+    def test_default_representation_is_unchanged(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, QuizSerializer(self.quiz).data)
+
+    def test_fields(self):
+        # The quizzes, without any prefetch.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, {'fields': 'id,title'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'id': self.quiz.id, 'title': 'Quiz'}])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'fields': 'title'})
+        self.assertNotIn('description', queries.captured_queries[-1]['sql'])
+
+    def test_expand(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(self.url, {'expand': 'questions'})
+        self.assertEqual(response.data['tags'], [self.tag.id])
+        self.assertEqual(response.data['questions'], [
+            {'id': self.question.id, 'text': 'Question', 'type': 'MC', 'points': 1}])
+
+        response = self.client.get(self.url, {'expand': 'questions.answers'})
+        self.assertEqual(response.data['questions'][0]['answers'],
+                         [{'id': self.answer.id, 'text': 'Answer', 'is_correct': True}])
+
+        response = self.client.get(self.url, {'expand': ''})
+        self.assertNotIn('questions', response.data)
+
+    def test_nested_fields(self):
+        response = self.client.get(self.url, {'fields': 'id,questions.text,questions.answers.text',
+                                              'expand': 'questions.answers'})
+        self.assertEqual(response.data, {
+            'id': self.quiz.id,
+            'questions': [{'text': 'Question', 'answers': [{'text': 'Answer'}]}],
+        })
+
+    def test_question_endpoints(self):
+        # ETag state and the questions, without prefetching their answers.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('quiz:question-list-create', args=[self.quiz.id]),
+                                       {'fields': 'id,text'})
+        self.assertEqual(response.data['results'], [{'id': self.question.id, 'text': 'Question'}])
+
+        response = self.client.get(reverse('quiz:question-retrieve-update-delete', args=[self.question.id]),
+                                   {'expand': ''})
+        self.assertNotIn('answers', response.data)
+
+    def test_unknown_fields(self):
+        response = self.client.get(self.url, {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+        response = self.client.get(self.url, {'expand': 'tags'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', response.data)
+
+
+class FastJSONRendererTest(APITestCase):
+    def setUp(self):
+        self.user = UserProfile.objects.create(username='admin', is_staff=True)
+        self.quiz = Quiz.objects.create(title='Quiz \u2028 "déjà vu" 🎓', description='Line\nbreak\u2029',
+                                        time_limit=10, created_by=self.user)
+        self.quiz.tags.add(Tag.objects.create(name='easy'))
+        for index in range(20):
+            question = Question.objects.create(quiz=self.quiz, text=f'Question {index} <b>&</b>', type='MC', points=index)
+            Answer.objects.create(question=question, text='Right', is_correct=True)
+            Answer.objects.create(question=question, text='Wrong', is_correct=False)
+
+    def assertSameBytes(self, data, accepted_media_type=None):
+        expected = JSONRenderer().render(data, accepted_media_type)
+        self.assertEqual(FastJSONRenderer().render(data, accepted_media_type), expected)
+
+    def test_serialized_quiz(self):
+        self.assertSameBytes(QuizSerializer(Quiz.objects.with_content().get()).data)
+
+    def test_python_values(self):
+        self.assertSameBytes({
+            'created': timezone.now(),
+            'date': timezone.now().date(),
+            'duration': timedelta(minutes=5),
+            'decimal': Decimal('1.5'),
+            'uuid': uuid.UUID(int=1),
+            'queryset': Tag.objects.values_list('name', flat=True),
+            1: 'integer key',
+            'float': 0.1,
+            'nested': [None, True, False, (1, 2), {'a': []}],
+        })
+        # Beyond 64 bits, orjson gives up and the stdlib encodes the whole payload.
+        self.assertSameBytes({'big': 2 ** 70})
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_floats(self):
+        for value in (0.1, 1e-7, 1e16, -2e-06, 1.5212603486793025e-05, 123456789.125, Decimal('1e-7')):
+            self.assertSameBytes({'rank': value, 'ranks': [{'rank': value}]})
+            self.assertSameBytes(value)
+        self.assertSameBytes({1e-7: 'float key'})
+        self.assertSameBytes({'ranks': Tag.objects.annotate(rank=Value(1e-7)).values_list('rank', flat=True)})
+
+        for value in (float('nan'), float('inf')):
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({'rank': value})
+            # Sets go through the DRF encoder.
+            for data in ({'rank': value}, [None, value], {'ranks': {value}}):
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render(data)
+
+    def test_indent_uses_stdlib(self):
+        self.assertSameBytes({'a': [1, 2]}, 'application/json; indent=4')
+
+    def test_stdlib_fallback(self):
+        with mock.patch('QuizAPI.renderers.orjson', None):
+            self.assertSameBytes(QuizSerializer(Quiz.objects.with_content().get()).data)
+
+    def test_api_response(self):
+        response = self.client.get(reverse('quiz:quiz-retrieve-update-delete', args=[self.quiz.id]))
+        self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+    def test_parser(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(BytesIO('{"a": [1, "é", 1.5]}'.encode())), {'a': [1, 'é', 1.5]})
+        for content in (b'{"a": ', b'{"a": NaN}'):
+            with self.assertRaises(ParseError):
+                parser.parse(BytesIO(content))
+
+    def test_api_parses_json(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post(reverse('quiz:tag-list-create'), '{"name": "hard"}', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        response = self.client.post(reverse('quiz:tag-list-create'), '{"name": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
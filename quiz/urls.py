@@ -2,11 +2,14 @@ from django.urls import path
 from .views import (
     CategoryListCreateView, CategoryRetrieveUpdateDeleteView,
     TagListCreateView, TagRetrieveUpdateDeleteView,
-    QuizListCreateView, QuizRetrieveUpdateDeleteView,
-    QuestionListCreateView, QuestionRetrieveUpdateDeleteView,
+    QuizListCreateView, QuizRetrieveUpdateDeleteView, QuizSearchView, QuizDeliveryView,
+    QuestionListCreateView, QuestionBulkCreateView, QuestionRetrieveUpdateDeleteView,
     AnswerListCreateView, AnswerRetrieveUpdateDeleteView,
-    FeedbackListCreateView, FeedbackRetrieveUpdateDeleteView, SubmitQuizView, StartQuizView
+    FeedbackListCreateView, FeedbackRetrieveUpdateDeleteView, SubmitQuizView, StartQuizView, LeaderboardView,
+    QuizAttemptListView,
+    ResponseCacheStatsView
 )
+from .async_views import AsyncStartQuizView, AsyncSubmitQuizView
 
 app_name = 'quiz'
 
@@ -19,10 +22,18 @@ urlpatterns = [
     path('quizzes/tags/<int:pk>/', TagRetrieveUpdateDeleteView.as_view(), name='tag-retrieve-update-delete'),
 
     path('quizzes/', QuizListCreateView.as_view(), name='quiz-list-create'),
+    path('quizzes/search/', QuizSearchView.as_view(), name='quiz-search'),
     path('quizzes/<int:pk>/', QuizRetrieveUpdateDeleteView.as_view(), name='quiz-retrieve-update-delete'),
     path('quizzes/<int:pk>/questions/', QuestionListCreateView.as_view(), name='question-list-create'),
+    path('quizzes/<int:pk>/questions/bulk/', QuestionBulkCreateView.as_view(), name='question-bulk-create'),
+    path('quizzes/<int:pk>/delivery/', QuizDeliveryView.as_view(), name='quiz-delivery'),
     path('quizzes/start/', StartQuizView.as_view(), name='start-quiz'),
     path('quizzes/submit/', SubmitQuizView.as_view(), name='submit-quiz'),
+    # Async versions of the exam hot path, for ASGI deployments.
+    path('async/quizzes/start/', AsyncStartQuizView.as_view(), name='async-start-quiz'),
+    path('async/quizzes/submit/', AsyncSubmitQuizView.as_view(), name='async-submit-quiz'),
+    path('quizzes/<int:pk>/attempts/', QuizAttemptListView.as_view(), name='quiz-attempt-list'),
+    path('quizzes/<int:pk>/leaderboard/', LeaderboardView.as_view(), name='leaderboard'),
 
     path('questions/<int:pk>/', QuestionRetrieveUpdateDeleteView.as_view(), name='question-retrieve-update-delete'),
     path('questions/<int:pk>/answers/', AnswerListCreateView.as_view(), name='answer-list-create'),
@@ -30,5 +41,7 @@ urlpatterns = [
     path('answers/<int:pk>/', AnswerRetrieveUpdateDeleteView.as_view(), name='answer-retrieve-update-delete'),
 
     path('quizzes/<int:pk>/feedback/', FeedbackListCreateView.as_view(), name='feedback-list-create'),
-    path('feedback/<int:pk>/', FeedbackRetrieveUpdateDeleteView.as_view(), name='feedback-retrieve-update-delete')
+    path('feedback/<int:pk>/', FeedbackRetrieveUpdateDeleteView.as_view(), name='feedback-retrieve-update-delete'),
+
+    path('cache/stats/', ResponseCacheStatsView.as_view(), name='response-cache-stats'),
 ]
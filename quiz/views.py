@@ -1,51 +1,86 @@
-from rest_framework import generics, status
+from rest_framework import generics, serializers, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
-from django.utils import timezone
-from datetime import timedelta
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
 
-from .models import Category, Tag, Quiz, Question, Answer, Participant, Feedback
+from .models import Category, Tag, Quiz, Question, Answer, QuizAttempt, Feedback, LeaderboardEntry
 from .serializers import (
-    CategorySerializer, TagSerializer, QuizSerializer,
-    QuestionSerializer, AnswerSerializer, FeedbackSerializer, SubmitQuizSerializer
+    CategorySerializer, TagSerializer, QuizSerializer, QuizSearchResultSerializer,
+    QuestionSerializer, AnswerSerializer, FeedbackSerializer, SubmitQuizSerializer, QuizAttemptSerializer,
+    MAX_BULK_QUESTIONS
+)
+from .attempts import start_attempt
+from .leaderboard import top_entries, rank_of
+from .delivery import get_delivery_payload
+from .search import search_quizzes
+from .filters import QuizFacetFilter, filter_quizzes, facet_counts
+from .caching import category_namespaces, tag_namespaces, quiz_namespaces
+from .sparse import SparseFieldsMixin
+from .conditional import (
+    conditional_get, category_list_state, category_state, tag_list_state, tag_state,
+    quiz_list_state, quiz_state, question_list_state, question_state
 )
 from .permissions import IsStaffOrReadOnly, IsAuthenticatedOrReadOnly, IsFeedbackOwner
 
 from django.utils.decorators import method_decorator
 
 from .swagger import *
+from QuizAPI.pagination import IdCursorPagination, StartedAtCursorPagination
+from QuizAPI.response_cache import cache_response, get_response_cache
+
+
+def integer_param(request, name, default, minimum, maximum=None):
+    """
+    Read an integer query parameter, rejecting values below `minimum` and capping them at `maximum`.
+    """
+    try:
+        value = int(request.query_params.get(name, default))
+    except ValueError:
+        raise serializers.ValidationError({name: 'A valid integer is required.'})
+    if value < minimum:
+        raise serializers.ValidationError({name: f'Ensure this value is greater than or equal to {minimum}.'})
+    return min(value, maximum) if maximum is not None else value
 
 
+@method_decorator(name='get', decorator=cache_response(category_namespaces))
 @method_decorator(name='get', decorator=category_list_swagger_schema())
 @method_decorator(name='post', decorator=category_create_swagger_schema())
+@method_decorator(name='get', decorator=conditional_get(category_list_state))
 class CategoryListCreateView(generics.ListCreateAPIView):
     permission_classes = (IsStaffOrReadOnly,)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
+@method_decorator(name='get', decorator=cache_response(category_namespaces))
 @method_decorator(name='get', decorator=category_retrieve_swagger_schema())
 @method_decorator(name='put', decorator=category_update_swagger_schema())
 @method_decorator(name='delete', decorator=category_delete_swagger_schema())
+@method_decorator(name='get', decorator=conditional_get(category_state))
 class CategoryRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = (IsStaffOrReadOnly,)
 
 
+@method_decorator(name='get', decorator=cache_response(tag_namespaces))
 @method_decorator(name='get', decorator=tag_list_swagger_schema())
 @method_decorator(name='post', decorator=tag_create_swagger_schema())
+@method_decorator(name='get', decorator=conditional_get(tag_list_state))
 class TagListCreateView(generics.ListCreateAPIView):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (IsStaffOrReadOnly,)
 
 
+@method_decorator(name='get', decorator=cache_response(tag_namespaces))
 @method_decorator(name='get', decorator=tag_retrieve_swagger_schema())
 @method_decorator(name='put', decorator=tag_update_swagger_schema())
 @method_decorator(name='delete', decorator=tag_delete_swagger_schema())
+@method_decorator(name='get', decorator=conditional_get(tag_state))
 class TagRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
@@ -54,25 +89,88 @@ class TagRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
 
 @method_decorator(name='get', decorator=quiz_list_swagger_schema())
 @method_decorator(name='post', decorator=quiz_create_swagger_schema())
-class QuizListCreateView(generics.ListCreateAPIView):
-    queryset = Quiz.objects.all()
+@method_decorator(name='get', decorator=conditional_get(quiz_list_state))
+class QuizListCreateView(SparseFieldsMixin, generics.ListCreateAPIView):
+    queryset = Quiz.objects.with_content()
     serializer_class = QuizSerializer
 
     permission_classes = (IsStaffOrReadOnly,)
+    pagination_class = IdCursorPagination
+    filter_backends = (QuizFacetFilter,)
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('facets') == 'true':
+            response.data['facets'] = facet_counts(self.filter_queryset(Quiz.objects.all()))
+        return response
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
+@method_decorator(name='get', decorator=cache_response(quiz_namespaces))
 @method_decorator(name='get', decorator=quiz_retrieve_swagger_schema())
 @method_decorator(name='put', decorator=quiz_update_swagger_schema())
 @method_decorator(name='delete', decorator=quiz_delete_swagger_schema())
-class QuizRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Quiz.objects.all()
+@method_decorator(name='get', decorator=conditional_get(quiz_state))
+class QuizRetrieveUpdateDeleteView(SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Quiz.objects.with_content()
     serializer_class = QuizSerializer
     permission_classes = (IsStaffOrReadOnly,)
 
 
+@method_decorator(name='get', decorator=quiz_search_swagger_schema())
+class QuizSearchView(APIView):
+    permission_classes = (IsStaffOrReadOnly,)
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'q': 'A search query is required.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        limit = integer_param(request, 'limit', self.default_limit, 1, self.max_limit)
+        offset = integer_param(request, 'offset', 0, 0)
+
+        queryset = None
+        if any(param in request.query_params for param in ('categories', 'tags')):
+            queryset = filter_quizzes(Quiz.objects.all(), request.query_params)
+
+        matches = search_quizzes(query, queryset, limit=limit, offset=offset)
+        ranks = dict(matches)
+        quizzes = Quiz.objects.filter(id__in=ranks).prefetch_related('tags', 'categories').in_bulk()
+        serializer = QuizSearchResultSerializer(
+            [quizzes[quiz_id] for quiz_id, _ in matches if quiz_id in quizzes], many=True, context={'ranks': ranks})
+
+        return Response({
+            'q': query,
+            'results': serializer.data,
+            'next_offset': offset + limit if len(matches) == limit else None,
+        })
+
+
+@method_decorator(name='get', decorator=quiz_delivery_swagger_schema())
+class QuizDeliveryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk, *args, **kwargs):
+        payload = get_delivery_payload(pk)
+        if payload is None:
+            return Response({'error': 'Invalid quiz ID'}, status=status.HTTP_404_NOT_FOUND)
+
+        if payload.gzipped is not None and 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response = HttpResponse(payload.gzipped, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+            response['ETag'] = payload.gzipped_etag
+        else:
+            response = HttpResponse(payload.content, content_type='application/json')
+            response['ETag'] = payload.etag
+        response['Vary'] = 'Accept-Encoding'
+
+        return get_conditional_response(request, etag=response['ETag'], response=response)
+
+
 @method_decorator(name='post', decorator=start_quiz_swagger_schema())
 class StartQuizView(APIView):
     permission_classes = [IsAuthenticated]
@@ -82,24 +180,14 @@ class StartQuizView(APIView):
         quiz_id = request.data.get('quiz_id')
 
         try:
-            quiz = Quiz.objects.get(id=quiz_id)
+            time_limit = Quiz.objects.filter(id=quiz_id).values_list('time_limit', flat=True).first()
+        except (TypeError, ValueError):
+            time_limit = None
 
-        except Quiz.DoesNotExist:
+        if time_limit is None:
             return Response({'quiz_id': 'Invalid quiz ID'}, status=status.HTTP_400_BAD_REQUEST)
 
-        start_time = timezone.now()
-        time_limit = quiz.time_limit
-        end_time = start_time + timedelta(minutes=time_limit)
-
-        try:
-            participant = Participant.objects.get(user=user, quiz=quiz)
-            participant.start_time = start_time
-            participant.end_time = end_time
-            participant.score = None
-            participant.save()
-
-        except Participant.DoesNotExist:
-            Participant.objects.create(user=user, quiz=quiz, start_time=start_time, end_time=end_time, score=None)
+        start_attempt(user, quiz_id, time_limit)
 
         return Response({'message': 'Quiz started successfully'}, status=status.HTTP_200_OK)
 
@@ -116,22 +204,69 @@ class SubmitQuizView(APIView):
         return Response({'message': 'Quiz submitted successfully', 'data': serializer.data})
 
 
+@method_decorator(name='get', decorator=attempt_list_swagger_schema())
+class QuizAttemptListView(generics.ListAPIView):
+    serializer_class = QuizAttemptSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StartedAtCursorPagination
+
+    def get_queryset(self):
+        # Served by attempt_history_idx (user, quiz, started_at, id).
+        return QuizAttempt.objects.filter(user=self.request.user, quiz_id=self.kwargs['pk'])
+
+
+@method_decorator(name='get', decorator=leaderboard_swagger_schema())
+class LeaderboardView(APIView):
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+    default_limit = 10
+    max_limit = 100
+
+    def get(self, request, pk, *args, **kwargs):
+        if not Quiz.objects.filter(pk=pk).exists():
+            return Response({'error': 'Invalid quiz ID'}, status=status.HTTP_404_NOT_FOUND)
+
+        limit = integer_param(request, 'limit', self.default_limit, 1, self.max_limit)
+
+        me = None
+        if request.user and request.user.is_authenticated:
+            entry = LeaderboardEntry.objects.filter(quiz_id=pk, user=request.user).first()
+            if entry is not None:
+                rank, _ = rank_of(pk, entry.score)
+                me = {'rank': rank, 'score': entry.score}
+
+        return Response({'quiz_id': pk, 'results': top_entries(pk, limit), 'me': me})
+
+
 @method_decorator(name='get', decorator=question_list_swagger_schema())
 @method_decorator(name='post', decorator=question_create_swagger_schema())
-class QuestionListCreateView(generics.ListCreateAPIView):
+@method_decorator(name='get', decorator=conditional_get(question_list_state))
+class QuestionListCreateView(SparseFieldsMixin, generics.ListCreateAPIView):
     serializer_class = QuestionSerializer
     permission_classes = (IsStaffOrReadOnly,)
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         pk = self.kwargs['pk']
-        return Question.objects.filter(quiz_id=pk)
+        return Question.objects.filter(quiz_id=pk).prefetch_related('answers')
+
+
+@method_decorator(name='post', decorator=question_bulk_create_swagger_schema())
+class QuestionBulkCreateView(generics.CreateAPIView):
+    serializer_class = QuestionSerializer
+    permission_classes = (IsStaffOrReadOnly,)
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['many'] = True
+        kwargs['max_length'] = MAX_BULK_QUESTIONS
+        return super().get_serializer(*args, **kwargs)
 
 
 @method_decorator(name='get', decorator=question_retrieve_swagger_schema())
 @method_decorator(name='put', decorator=question_update_swagger_schema())
 @method_decorator(name='delete', decorator=question_delete_swagger_schema())
-class QuestionRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Question.objects.all()
+@method_decorator(name='get', decorator=conditional_get(question_state))
+class QuestionRetrieveUpdateDeleteView(SparseFieldsMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Question.objects.prefetch_related('answers')
     serializer_class = QuestionSerializer
     permission_classes = (IsStaffOrReadOnly,)
 
@@ -163,6 +298,7 @@ class FeedbackListCreateView(generics.ListCreateAPIView):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    pagination_class = IdCursorPagination
 
     def get_queryset(self):
         pk = self.kwargs['pk']
@@ -186,3 +322,11 @@ class FeedbackRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
         context = super().get_serializer_context()
         context['user'] = self.request.user
         return context
+
+
+@method_decorator(name='get', decorator=response_cache_stats_swagger_schema())
+class ResponseCacheStatsView(APIView):
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_response_cache().stats())